@@ -1,14 +1,36 @@
 # ai_summary.py
+from functools import lru_cache
+from typing import List
+
 import nltk
-nltk.download("punkt_tab")
+import numpy as np
+
+# Only hit the network when the tokenizer data isn't already installed
+try:
+    nltk.data.find("tokenizers/punkt_tab")
+except LookupError:
+    nltk.download("punkt_tab", quiet=True)
 
 from sumy.parsers.plaintext import PlaintextParser
 from sumy.nlp.tokenizers import Tokenizer
 from sumy.summarizers.lex_rank import LexRankSummarizer
 
+# Number of (text, sentence_count) summaries remembered; the same articles
+# are summarized by several endpoints within minutes of each other
+SUMMARY_CACHE_SIZE = 2048
+
+@lru_cache(maxsize=SUMMARY_CACHE_SIZE)
 def summarize_article(text: str, sentence_count: int = 3) -> str:
     """
     Returns an extractive summary of the article.
+    Results are memoized by text and sentence_count.
+    sentence_count: number of sentences to include in summary
+    """
+    return lexrank_summary(text, sentence_count)
+
+def lexrank_summary(text: str, sentence_count: int = 3) -> str:
+    """
+    Uncached LexRank summary, for callers that keep their own cache.
     sentence_count: number of sentences to include in summary
     """
     if not text or len(text.strip()) == 0:
@@ -20,3 +42,46 @@ def summarize_article(text: str, sentence_count: int = 3) -> str:
     
     # Combine sentences into a single string
     return " ".join(str(sentence) for sentence in summary_sentences)
+
+def summarize_articles_batch(texts: List[str], sentence_count: int = 3, model=None) -> List[str]:
+    """
+    Returns extractive summaries for several articles at once.
+    Keeps the sentences closest to each article's embedding centroid, in their
+    original order, using a single batched encode for every sentence.
+    model: a loaded SentenceTransformer; falls back to LexRank when None
+    """
+    if model is None:
+        return [summarize_article(text, sentence_count) for text in texts]
+    
+    sentences_per_text = [
+        nltk.sent_tokenize(text) if text and text.strip() else [] for text in texts
+    ]
+    all_sentences = [sentence for sentences in sentences_per_text for sentence in sentences]
+    if not all_sentences:
+        return ["" for _ in texts]
+    
+    embeddings = model.encode(
+        all_sentences,
+        batch_size=128,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False
+    )
+    
+    summaries = []
+    offset = 0
+    for sentences in sentences_per_text:
+        count = len(sentences)
+        article_embeddings = embeddings[offset:offset + count]
+        offset += count
+        
+        if count <= sentence_count:
+            summaries.append(" ".join(sentences))
+            continue
+        
+        # Score sentences by similarity to the article centroid
+        scores = article_embeddings @ article_embeddings.mean(axis=0)
+        top = np.sort(np.argpartition(-scores, sentence_count)[:sentence_count])
+        summaries.append(" ".join(sentences[i] for i in top))
+    
+    return summaries
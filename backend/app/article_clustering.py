@@ -1,151 +1,197 @@
+import hashlib
 import logging
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, NamedTuple, Tuple
+import torch
 from sentence_transformers import SentenceTransformer
-from sklearn.cluster import KMeans, DBSCAN
+from sklearn.cluster import DBSCAN
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 from collections import Counter
+from cachetools import LRUCache
 import re
+import threading
+from app.models import RawArticle
 
 logger = logging.getLogger(__name__)
 
+# Batch size for sentence embedding; larger batches amortize per-call overhead
+EMBEDDING_BATCH_SIZE = 64
+# Cosine distance threshold for grouping articles into the same topic
+COSINE_EPS = 0.3
+# Up to this many articles, cluster with a similarity graph instead of DBSCAN
+GRAPH_CLUSTERING_MAX_ARTICLES = 200
+# Number of article embeddings kept across requests
+EMBEDDING_CACHE_SIZE = 10_000
+
+# Entity patterns, compiled once: capitalized phrases (potential proper nouns)
+# and common organization suffixes
+_CAPITALIZED_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+_ORG_RE = re.compile(
+    r'\b[A-Z][a-z]+\s+(Inc|Corp|LLC|Ltd|Company|Corporation'
+    r'|University|College|Institute|Bank|Financial|Group)\b'
+)
+
+# Word tokenizers for title themes (3+ letters) and fallback keywords (4+ letters)
+_WORD3_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_WORD4_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+# Stop words ignored when finding common title themes
+_THEME_STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her',
+    'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its',
+    'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'man', 'oil',
+    'sit', 'try', 'use', 'way', 'with', 'this', 'that', 'from', 'they', 'know',
+    'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when', 'come', 'here',
+    'just', 'like', 'long', 'make', 'many', 'over', 'such', 'take', 'than', 'them',
+    'well', 'were'
+})
+
+# Stop words ignored when picking fallback clustering keywords
+_FALLBACK_STOP_WORDS = frozenset({
+    'this', 'that', 'with', 'from', 'they', 'have', 'been', 'will', 'said', 'more',
+    'than', 'also', 'each', 'which', 'their', 'time', 'very', 'when', 'much',
+    'new', 'some', 'these', 'may', 'other', 'after', 'first', 'well', 'year',
+    'work', 'such', 'make', 'over', 'think', 'back', 'where', 'before', 'move',
+    'right', 'boy', 'old', 'too', 'same', 'she', 'all', 'there', 'up', 'use',
+    'word', 'how', 'an', 'do', 'if', 'about', 'out', 'many', 'then', 'them', 'can',
+    'only', 'what', 'get', 'through', 'go', 'good', 'want', 'because', 'any',
+    'give', 'day', 'most', 'us'
+})
+
+class ArticleColumns(NamedTuple):
+    """Per-article fields as parallel lists (structure of arrays)."""
+    titles: List[str]
+    texts: List[str]
+    entities: List[List[str]]
+    title_words: List[List[str]]
+
 class ArticleClusterer:
     def __init__(self):
         """Initialize the article clustering service."""
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.embedding_model = None
         self._model_loaded = False
+        self._model_lock = threading.Lock()
+        # Embeddings keyed by text hash; the same articles recur across refreshes
+        self._embedding_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
         # Don't load models at startup to save memory
     
     def _load_models(self):
         """Load the sentence embedding model only when needed."""
         if self._model_loaded:
             return
+        
+        # Concurrent requests must not each load their own copy of the model
+        with self._model_lock:
+            if self._model_loaded:
+                return
             
-        try:
-            logger.info("Loading sentence embedding model...")
-            # Use a smaller, more memory-efficient model
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2', use_auth_token=False)
+            try:
+                logger.info("Loading sentence embedding model...")
+                # Use a smaller, more memory-efficient model
+                self.embedding_model = SentenceTransformer(
+                    'all-MiniLM-L6-v2', device=self.device, use_auth_token=False
+                )
+                if self.device == "cuda":
+                    # Half precision halves memory traffic on GPU
+                    self.embedding_model.half()
+                else:
+                    self._quantize_for_cpu()
+                logger.info(f"Embedding model using device: {self.device}")
+                logger.info("Sentence embedding model loaded successfully")
+            except Exception as e:
+                logger.warning(f"Failed to load embedding model: {e}")
+                # Fallback to a simpler approach - we'll use basic text similarity
+                self.embedding_model = None
+                logger.info("Using fallback text similarity approach")
             self._model_loaded = True
-            logger.info("Sentence embedding model loaded successfully")
+    
+    def _quantize_for_cpu(self):
+        """Quantize the embedding model's linear layers to int8 for faster CPU inference."""
+        try:
+            torch.ao.quantization.quantize_dynamic(
+                self.embedding_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            logger.info("Quantized embedding model to int8")
         except Exception as e:
-            logger.warning(f"Failed to load embedding model: {e}")
-            # Fallback to a simpler approach - we'll use basic text similarity
-            self.embedding_model = None
-            self._model_loaded = True
-            logger.info("Using fallback text similarity approach")
+            logger.warning(f"Could not quantize embedding model, using fp32: {e}")
     
     def extract_entities(self, text: str) -> List[str]:
         """Extract key entities from text using simple regex patterns."""
-        entities = []
-        
         # Extract capitalized words (potential proper nouns)
-        capitalized_words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        entities.extend(capitalized_words)
+        entities = _CAPITALIZED_RE.findall(text)
         
         # Extract common organization patterns
-        org_patterns = [
-            r'\b[A-Z][a-z]+\s+(Inc|Corp|LLC|Ltd|Company|Corporation)\b',
-            r'\b[A-Z][a-z]+\s+(University|College|Institute)\b',
-            r'\b[A-Z][a-z]+\s+(Bank|Financial|Group)\b'
-        ]
-        
-        for pattern in org_patterns:
-            matches = re.findall(pattern, text)
-            entities.extend(matches)
+        entities.extend(_ORG_RE.findall(text))
         
         return entities
     
-    def cluster_articles(self, articles: List[Dict[str, Any]], 
+    def cluster_articles(self, articles: List[RawArticle], 
                         min_cluster_size: int = 3, 
                         max_clusters: int = 10) -> List[Dict[str, Any]]:
         """
         Cluster articles by topic similarity.
         
         Args:
-            articles: List of article dictionaries
+            articles: List of fetched articles
             min_cluster_size: Minimum number of articles per cluster
             max_clusters: Maximum number of clusters to create
             
         Returns:
             List of clusters with their articles and summaries
         """
+        # Build per-article columns once; every later pass indexes into them
+        columns = self._build_columns(articles)
+        all_indices = list(range(len(articles)))
+        
         if len(articles) < min_cluster_size:
             # If too few articles, return as single cluster
-            return [{
-                "cluster_id": 0,
-                "articles": articles,
-                "summary": self._create_cluster_summary(articles),
-                "key_entities": self._extract_cluster_entities(articles),
-                "size": len(articles)
-            }]
+            return [self._build_cluster(0, articles, columns, all_indices)]
         
         try:
-            # Prepare text for embedding
-            texts = []
-            for article in articles:
-                # Combine title and description for better clustering
-                text = f"{article.get('title', '')} {article.get('content', '')}"
-                texts.append(text)
-            
             # Try to load model if not already loaded
             self._load_models()
             
             # Generate embeddings or use fallback
             if self.embedding_model is not None:
-                logger.info(f"Generating embeddings for {len(texts)} articles...")
-                embeddings = self.embedding_model.encode(texts)
+                embeddings = self._encode_texts(columns.texts)
             else:
                 logger.info("Using fallback keyword-based clustering...")
-                return self._fallback_clustering(articles, min_cluster_size, max_clusters)
-            
-            # Determine optimal number of clusters
-            n_clusters = min(max_clusters, max(2, len(articles) // min_cluster_size))
+                return self._fallback_clustering(articles, columns, min_cluster_size, max_clusters)
             
-            # Perform clustering using DBSCAN for better cluster shapes
-            clusterer = DBSCAN(
-                eps=0.3,  # Distance threshold
-                min_samples=min_cluster_size,
-                metric='cosine'
-            )
-            
-            cluster_labels = clusterer.fit_predict(embeddings)
+            if len(articles) <= GRAPH_CLUSTERING_MAX_ARTICLES:
+                # For typical request sizes one similarity matrix is cheaper
+                # than building DBSCAN's neighbor index
+                cluster_labels = self._cluster_by_similarity_graph(embeddings, min_cluster_size)
+            else:
+                # Perform clustering using DBSCAN for better cluster shapes.
+                # Embeddings are unit-normalized, so euclidean distance is equivalent
+                # to cosine distance (||a-b||^2 = 2 - 2cos) and cheaper to compute.
+                clusterer = DBSCAN(
+                    eps=np.sqrt(2 * COSINE_EPS),  # Distance threshold
+                    min_samples=min_cluster_size,
+                    metric='euclidean',
+                    n_jobs=-1  # Parallelize neighbor queries across cores
+                )
+                
+                cluster_labels = clusterer.fit_predict(embeddings)
             
             # Handle noise points (label -1) by assigning to nearest cluster
-            if -1 in cluster_labels:
-                noise_indices = np.where(cluster_labels == -1)[0]
-                for idx in noise_indices:
-                    # Find nearest cluster
-                    distances = []
-                    for cluster_id in set(cluster_labels):
-                        if cluster_id != -1:
-                            cluster_embeddings = embeddings[cluster_labels == cluster_id]
-                            if len(cluster_embeddings) > 0:
-                                mean_embedding = np.mean(cluster_embeddings, axis=0)
-                                distance = np.linalg.norm(embeddings[idx] - mean_embedding)
-                                distances.append((distance, cluster_id))
-                    
-                    if distances:
-                        _, nearest_cluster = min(distances)
-                        cluster_labels[idx] = nearest_cluster
+            cluster_labels = self._assign_noise_to_nearest(embeddings, cluster_labels)
             
-            # Group articles by cluster
+            # Group article indices by cluster
             clusters = {}
             for i, label in enumerate(cluster_labels):
-                if label not in clusters:
-                    clusters[label] = []
-                clusters[label].append(articles[i])
+                clusters.setdefault(label, []).append(i)
             
             # Create cluster summaries
-            cluster_results = []
-            for cluster_id, cluster_articles in clusters.items():
-                if len(cluster_articles) >= min_cluster_size:
-                    cluster_summary = {
-                        "cluster_id": cluster_id,
-                        "articles": cluster_articles,
-                        "summary": self._create_cluster_summary(cluster_articles),
-                        "key_entities": self._extract_cluster_entities(cluster_articles),
-                        "size": len(cluster_articles)
-                    }
-                    cluster_results.append(cluster_summary)
+            cluster_results = [
+                self._build_cluster(cluster_id, articles, columns, indices)
+                for cluster_id, indices in clusters.items()
+                if len(indices) >= min_cluster_size
+            ]
             
             # Sort by cluster size (largest first)
             cluster_results.sort(key=lambda x: x["size"], reverse=True)
@@ -156,25 +202,104 @@ class ArticleClusterer:
         except Exception as e:
             logger.error(f"Error clustering articles: {e}")
             # Fallback: return all articles as single cluster
-            return [{
-                "cluster_id": 0,
-                "articles": articles,
-                "summary": self._create_cluster_summary(articles),
-                "key_entities": self._extract_cluster_entities(articles),
-                "size": len(articles)
-            }]
+            return [self._build_cluster(0, articles, columns, all_indices)]
     
-    def _extract_cluster_entities(self, articles: List[Dict[str, Any]]) -> List[str]:
-        """Extract key entities from a cluster of articles."""
-        all_entities = []
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, only running the model on ones not already cached."""
+        keys = [hashlib.sha1(text.encode("utf-8")).digest() for text in texts]
+        with self._cache_lock:
+            cached = [self._embedding_cache.get(key) for key in keys]
+        
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        if missing:
+            logger.info(f"Generating embeddings for {len(missing)} of {len(texts)} articles...")
+            # encode() already length-sorts inputs internally to minimize padding
+            new_embeddings = self.embedding_model.encode(
+                [texts[i] for i in missing],
+                batch_size=EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            with self._cache_lock:
+                for i, embedding in zip(missing, new_embeddings):
+                    cached[i] = embedding
+                    self._embedding_cache[keys[i]] = embedding
+        
+        return np.stack(cached)
+    
+    def _cluster_by_similarity_graph(self, embeddings: np.ndarray,
+                                     min_cluster_size: int) -> np.ndarray:
+        """
+        Cluster normalized embeddings as connected components of the graph
+        linking every pair within COSINE_EPS cosine distance.
+        
+        Components smaller than min_cluster_size are labelled as noise (-1).
+        """
+        similarity = embeddings @ embeddings.T
+        adjacency = csr_matrix(similarity >= 1 - COSINE_EPS)
+        _, labels = connected_components(adjacency, directed=False)
+        
+        component_sizes = np.bincount(labels)
+        return np.where(component_sizes[labels] >= min_cluster_size, labels, -1)
+    
+    def _assign_noise_to_nearest(self, embeddings: np.ndarray,
+                                 cluster_labels: np.ndarray) -> np.ndarray:
+        """Reassign noise points (label -1) to the cluster with the nearest centroid."""
+        noise_mask = cluster_labels == -1
+        cluster_ids = np.unique(cluster_labels[~noise_mask])
+        if not noise_mask.any() or len(cluster_ids) == 0:
+            return cluster_labels
+        
+        centroids = np.stack([
+            embeddings[cluster_labels == cluster_id].mean(axis=0)
+            for cluster_id in cluster_ids
+        ])
         
-        for article in articles:
-            text = f"{article.get('title', '')} {article.get('content', '')}"
-            entities = self.extract_entities(text)
-            all_entities.extend(entities)
+        # Squared euclidean distances for all noise points at once:
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2 (one matrix multiply)
+        noise_embeddings = embeddings[noise_mask]
+        distances = (
+            np.sum(noise_embeddings ** 2, axis=1)[:, None]
+            - 2 * noise_embeddings @ centroids.T
+            + np.sum(centroids ** 2, axis=1)[None, :]
+        )
         
+        cluster_labels = cluster_labels.copy()
+        cluster_labels[noise_mask] = cluster_ids[distances.argmin(axis=1)]
+        return cluster_labels
+    
+    def _build_columns(self, articles: List[RawArticle]) -> ArticleColumns:
+        """Extract the fields clustering needs from each article, once."""
+        titles = [article.title or '' for article in articles]
+        texts = [
+            f"{title} {article.content or ''}"
+            for title, article in zip(titles, articles)
+        ]
+        return ArticleColumns(
+            titles=titles,
+            texts=texts,
+            entities=[self.extract_entities(text) for text in texts],
+            title_words=[_WORD3_RE.findall(title.lower()) for title in titles]
+        )
+    
+    def _build_cluster(self, cluster_id: int, articles: List[RawArticle],
+                       columns: ArticleColumns, indices: List[int]) -> Dict[str, Any]:
+        """Build the cluster dictionary for the articles at the given indices."""
+        return {
+            "cluster_id": cluster_id,
+            "articles": [articles[i] for i in indices],
+            "summary": self._create_cluster_summary(columns, indices),
+            "key_entities": self._extract_cluster_entities(columns, indices),
+            "size": len(indices)
+        }
+    
+    def _extract_cluster_entities(self, columns: ArticleColumns, indices: List[int]) -> List[str]:
+        """Extract key entities from a cluster of articles."""
         # Count entity frequency and return most common
-        entity_counts = Counter(all_entities)
+        entity_counts = Counter(
+            entity for i in indices for entity in columns.entities[i]
+        )
         # Filter out very short entities and return top entities
         top_entities = [
             entity for entity, count in entity_counts.most_common(10)
@@ -183,25 +308,24 @@ class ArticleClusterer:
         
         return top_entities[:5]  # Return top 5 entities
     
-    def _create_cluster_summary(self, articles: List[Dict[str, Any]]) -> str:
+    def _create_cluster_summary(self, columns: ArticleColumns, indices: List[int]) -> str:
         """Create a summary for a cluster of articles."""
-        if not articles:
+        if not indices:
             return "No articles in cluster"
         
-        if len(articles) == 1:
-            return articles[0].get('title', 'No title available')
+        if len(indices) == 1:
+            return columns.titles[indices[0]] or 'No title available'
         
-        # Extract titles and descriptions
-        titles = [article.get('title', '') for article in articles if article.get('title')]
-        descriptions = [article.get('content', '') for article in articles if article.get('content')]
+        # Only articles with a title contribute to the summary
+        titled = [i for i in indices if columns.titles[i]]
         
         # Find common themes in titles
-        common_words = self._find_common_theme(titles)
+        common_words = self._find_common_theme([columns.title_words[i] for i in titled])
         
         # Create a simple summary based on most representative title
-        if titles:
+        if titled:
             # Use the longest title as it's likely most descriptive
-            main_title = max(titles, key=len)
+            main_title = max((columns.titles[i] for i in titled), key=len)
             
             if common_words:
                 return f"{main_title} (Related to: {', '.join(common_words[:3])})"
@@ -210,74 +334,56 @@ class ArticleClusterer:
         
         return "Multiple related articles"
     
-    def _find_common_theme(self, titles: List[str]) -> List[str]:
-        """Find common words/themes across titles."""
-        if len(titles) < 2:
+    def _find_common_theme(self, title_words: List[List[str]]) -> List[str]:
+        """Find common words/themes across titles, given each title's words."""
+        if len(title_words) < 2:
             return []
         
-        # Extract words from titles
-        all_words = []
-        for title in titles:
-            words = re.findall(r'\b[a-zA-Z]{3,}\b', title.lower())
-            all_words.extend(words)
-        
         # Count word frequency
-        word_counts = Counter(all_words)
+        word_counts = Counter(word for words in title_words for word in words)
         
-        # Filter out common stop words
-        stop_words = {'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'man', 'oil', 'sit', 'try', 'use', 'way', 'with', 'this', 'that', 'from', 'they', 'know', 'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when', 'come', 'here', 'just', 'like', 'long', 'make', 'many', 'over', 'such', 'take', 'than', 'them', 'well', 'were'}
-        
-        # Get common words (appearing in multiple titles)
+        # Get common words (appearing in multiple titles), skipping stop words
         common_words = [
             word for word, count in word_counts.most_common(10)
-            if word not in stop_words and count > 1
+            if word not in _THEME_STOP_WORDS and count > 1
         ]
         
         return common_words
     
-    def _fallback_clustering(self, articles: List[Dict[str, Any]], 
+    def _fallback_clustering(self, articles: List[RawArticle], columns: ArticleColumns,
                            min_cluster_size: int, max_clusters: int) -> List[Dict[str, Any]]:
         """Fallback clustering using keyword similarity when embeddings fail."""
         try:
-            # Group articles by common keywords
+            # Group article indices by common keywords
             keyword_groups = {}
             
-            for article in articles:
-                title = article.get('title', '').lower()
-                content = article.get('content', '').lower()
-                text = f"{title} {content}"
-                
+            for i, text in enumerate(columns.texts):
                 # Extract key terms
-                words = re.findall(r'\b[a-zA-Z]{4,}\b', text)
+                words = _WORD4_RE.findall(text.lower())
                 word_counts = Counter(words)
                 
                 # Get top keywords
                 top_keywords = [word for word, count in word_counts.most_common(5) 
-                              if word not in {'this', 'that', 'with', 'from', 'they', 'have', 'been', 'will', 'said', 'more', 'than', 'also', 'each', 'which', 'their', 'time', 'very', 'when', 'much', 'new', 'some', 'these', 'may', 'other', 'after', 'first', 'well', 'year', 'work', 'such', 'make', 'over', 'think', 'also', 'back', 'where', 'much', 'before', 'move', 'right', 'boy', 'old', 'too', 'same', 'she', 'all', 'there', 'when', 'up', 'use', 'word', 'how', 'said', 'an', 'each', 'which', 'do', 'their', 'time', 'if', 'will', 'about', 'out', 'many', 'then', 'them', 'can', 'only', 'other', 'new', 'some', 'what', 'time', 'very', 'when', 'much', 'get', 'through', 'back', 'much', 'before', 'go', 'good', 'new', 'want', 'because', 'any', 'these', 'give', 'day', 'most', 'us'}]
+                              if word not in _FALLBACK_STOP_WORDS]
                 
                 # Find or create group based on top keywords
                 assigned = False
                 for keyword in top_keywords[:3]:  # Use top 3 keywords
                     if keyword in keyword_groups:
-                        keyword_groups[keyword].append(article)
+                        keyword_groups[keyword].append(i)
                         assigned = True
                         break
                 
                 if not assigned and top_keywords:
                     # Create new group with first keyword
-                    keyword_groups[top_keywords[0]] = [article]
+                    keyword_groups[top_keywords[0]] = [i]
             
             # Convert to cluster format
-            clusters = []
-            for i, (keyword, group_articles) in enumerate(keyword_groups.items()):
-                if len(group_articles) >= min_cluster_size:
-                    clusters.append({
-                        "cluster_id": i,
-                        "articles": group_articles,
-                        "summary": self._create_cluster_summary(group_articles),
-                        "key_entities": self._extract_cluster_entities(group_articles),
-                        "size": len(group_articles)
-                    })
+            clusters = [
+                self._build_cluster(cluster_id, articles, columns, indices)
+                for cluster_id, indices in enumerate(keyword_groups.values())
+                if len(indices) >= min_cluster_size
+            ]
             
             # Sort by size and limit
             clusters.sort(key=lambda x: x["size"], reverse=True)
@@ -286,13 +392,7 @@ class ArticleClusterer:
         except Exception as e:
             logger.error(f"Error in fallback clustering: {e}")
             # Return single cluster with all articles
-            return [{
-                "cluster_id": 0,
-                "articles": articles,
-                "summary": self._create_cluster_summary(articles),
-                "key_entities": self._extract_cluster_entities(articles),
-                "size": len(articles)
-            }]
+            return [self._build_cluster(0, articles, columns, list(range(len(articles))))]
 
 # Global instance
 article_clusterer = ArticleClusterer()
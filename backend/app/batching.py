@@ -0,0 +1,90 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+class DynamicBatcher:
+    """
+    Coalesce concurrent calls to a batch function into shared batches.
+
+    Callers submit lists of inputs from any thread. A single worker thread
+    collects everything queued within max_delay seconds (up to max_batch_size
+    inputs) and runs it through batch_fn in one call, so concurrent requests
+    share one model forward pass instead of competing for the CPU/GPU.
+    Submissions larger than max_batch_size are split across batches.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64, max_delay: float = 0.005):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._queue = queue.Queue()
+        # A request that didn't fit in the previous batch starts the next one
+        self._carried = None
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, inputs: List[Any]) -> List[Any]:
+        """Run inputs through batch_fn, possibly alongside other callers' inputs."""
+        if not inputs:
+            return []
+        futures = []
+        for start in range(0, len(inputs), self._max_batch_size):
+            future = Future()
+            self._queue.put((inputs[start:start + self._max_batch_size], future))
+            futures.append(future)
+        return [output for future in futures for output in future.result()]
+
+    def _run(self):
+        while True:
+            if self._carried is not None:
+                pending = [self._carried]
+                self._carried = None
+            else:
+                pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self._max_delay
+
+            # Wait briefly for other callers to join this batch
+            while size < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if size + len(request[0]) > self._max_batch_size:
+                    self._carried = request
+                    break
+                pending.append(request)
+                size += len(request[0])
+
+            try:
+                outputs = self._batch_fn([item for inputs, _ in pending for item in inputs])
+            except Exception as e:
+                logger.error(f"Batched call failed: {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            expected = sum(len(inputs) for inputs, _ in pending)
+            if len(outputs) != expected:
+                error = RuntimeError(
+                    f"Batched call returned {len(outputs)} outputs for {expected} inputs"
+                )
+                logger.error(str(error))
+                for _, future in pending:
+                    future.set_exception(error)
+                continue
+
+            # Hand each caller back its slice of the outputs
+            offset = 0
+            for inputs, future in pending:
+                future.set_result(outputs[offset:offset + len(inputs)])
+                offset += len(inputs)
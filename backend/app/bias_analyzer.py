@@ -2,14 +2,32 @@ import re
 from typing import Dict, List, Tuple
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import torch
-from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import logging
+import os
+import hashlib
+import threading
+from pathlib import Path
+from cachetools import LRUCache
+from app.batching import DynamicBatcher
+from app.keywords import build_keyword_pattern
+from app.model_cache import build_model_dir
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of texts per transformer forward pass
+MODEL_BATCH_SIZE = 32
+# Number of analyzed articles remembered by (title, content)
+BIAS_CACHE_SIZE = 4096
+
+BIAS_MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+# Where the exported, int8-quantized ONNX copy of the bias model is kept
+ONNX_MODEL_DIR = Path(
+    os.getenv("MODEL_CACHE_DIR", Path(__file__).parent.parent / ".model_cache")
+) / "bias-model-onnx-int8"
+
 class BiasAnalyzer:
     def __init__(self):
         """Initialize the bias analyzer with various NLP models."""
@@ -34,9 +52,22 @@ class BiasAnalyzer:
             'fiscal responsibility', 'entrepreneurship', 'individual liberty'
         ]
         
+        self._keyword_side = {keyword: 'left' for keyword in self.left_keywords}
+        self._keyword_side.update({keyword: 'right' for keyword in self.right_keywords})
+        self._keyword_pattern = build_keyword_pattern(self._keyword_side)
+        
         # Don't load heavy models at startup to save memory
         self.bias_classifier = None
         self._model_loaded = False
+        self._model_lock = threading.Lock()
+        # Concurrent requests share classifier forward passes
+        self._model_batcher = DynamicBatcher(
+            self._run_classifier, max_batch_size=MODEL_BATCH_SIZE * 2
+        )
+        
+        # Results for articles already analyzed, so repeat views skip the models
+        self._result_cache = LRUCache(maxsize=BIAS_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
 
     def analyze_bias(self, title: str, content: str) -> Dict[str, any]:
         """
@@ -49,6 +80,11 @@ class BiasAnalyzer:
         Returns:
             Dictionary containing bias analysis results
         """
+        key = self._cache_key(title, content)
+        cached = self._get_cached_result(key)
+        if cached is not None:
+            return cached
+        
         try:
             # Combine title and content for analysis
             full_text = f"{title}. {content}"
@@ -56,40 +92,104 @@ class BiasAnalyzer:
             # Clean text
             cleaned_text = self._clean_text(full_text)
             
-            # Get keyword-based bias score
-            keyword_bias = self._analyze_keyword_bias(cleaned_text)
-            
-            # Get sentiment-based analysis
-            sentiment_analysis = self._analyze_sentiment(cleaned_text)
-            
             # Get model-based analysis (if available)
             model_bias = self._analyze_with_model(cleaned_text)
             
-            # Combine results
-            bias_score = self._combine_bias_scores(keyword_bias, sentiment_analysis, model_bias)
-            
-            # Determine bias category
-            bias_category = self._categorize_bias(bias_score)
-            
-            return {
-                'bias_score': bias_score,
-                'bias_category': bias_category,
-                'confidence': self._calculate_confidence(keyword_bias, sentiment_analysis, model_bias),
-                'details': {
-                    'keyword_analysis': keyword_bias,
-                    'sentiment_analysis': sentiment_analysis,
-                    'model_analysis': model_bias
-                }
-            }
+            result = self._build_bias_result(cleaned_text, model_bias)
+            if 'error' not in model_bias:
+                self._set_cached_result(key, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error in bias analysis: {e}")
-            return {
-                'bias_score': 0.0,
-                'bias_category': 'neutral',
-                'confidence': 0.0,
-                'details': {'error': str(e)}
+            return self._error_result(e)
+
+    def analyze_bias_batch(self, items: List[Tuple[str, str]]) -> List[Dict[str, any]]:
+        """
+        Analyze the political bias of several articles at once.
+        
+        The transformer model runs batched over all articles not already
+        in the result cache instead of being called once per article.
+        
+        Args:
+            items: List of (title, content) pairs
+            
+        Returns:
+            List of bias analysis dictionaries, in the same order as items
+        """
+        keys = [self._cache_key(title, content) for title, content in items]
+        results = [self._get_cached_result(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        try:
+            cleaned_texts = [self._clean_text(f"{items[i][0]}. {items[i][1]}") for i in missing]
+            model_results = self._analyze_with_model_batch(cleaned_texts)
+        except Exception as e:
+            logger.error(f"Error in batch bias analysis: {e}")
+            for i in missing:
+                results[i] = self._error_result(e)
+            return results
+        
+        for i, cleaned_text, model_bias in zip(missing, cleaned_texts, model_results):
+            try:
+                results[i] = self._build_bias_result(cleaned_text, model_bias)
+                # A failed model call is retried next time rather than cached
+                if 'error' not in model_bias:
+                    self._set_cached_result(keys[i], results[i])
+            except Exception as e:
+                logger.error(f"Error in bias analysis: {e}")
+                results[i] = self._error_result(e)
+        return results
+
+    def _cache_key(self, title: str, content: str) -> bytes:
+        """Stable cache key for an article's title and content."""
+        return hashlib.blake2b(f"{title}\0{content}".encode("utf-8"), digest_size=16).digest()
+
+    def _get_cached_result(self, key: bytes):
+        """Look up a previously analyzed article, or None."""
+        with self._cache_lock:
+            return self._result_cache.get(key)
+
+    def _set_cached_result(self, key: bytes, result: Dict[str, any]):
+        """Remember a successful analysis for later requests."""
+        with self._cache_lock:
+            self._result_cache[key] = result
+
+    def _build_bias_result(self, cleaned_text: str, model_bias: Dict[str, float]) -> Dict[str, any]:
+        """Combine keyword, sentiment and model analyses into a bias result."""
+        # Get keyword-based bias score
+        keyword_bias = self._analyze_keyword_bias(cleaned_text)
+        
+        # Get sentiment-based analysis
+        sentiment_analysis = self._analyze_sentiment(cleaned_text)
+        
+        # Combine results
+        bias_score = self._combine_bias_scores(keyword_bias, sentiment_analysis, model_bias)
+        
+        # Determine bias category
+        bias_category = self._categorize_bias(bias_score)
+        
+        return {
+            'bias_score': bias_score,
+            'bias_category': bias_category,
+            'confidence': self._calculate_confidence(keyword_bias, sentiment_analysis, model_bias),
+            'details': {
+                'keyword_analysis': keyword_bias,
+                'sentiment_analysis': sentiment_analysis,
+                'model_analysis': model_bias
             }
+        }
+
+    def _error_result(self, error: Exception) -> Dict[str, any]:
+        """Neutral result returned when analysis fails."""
+        return {
+            'bias_score': 0.0,
+            'bias_category': 'neutral',
+            'confidence': 0.0,
+            'details': {'error': str(error)}
+        }
 
     def _clean_text(self, text: str) -> str:
         """Clean and preprocess text for analysis."""
@@ -101,8 +201,10 @@ class BiasAnalyzer:
 
     def _analyze_keyword_bias(self, text: str) -> Dict[str, float]:
         """Analyze bias based on political keywords."""
-        left_count = sum(1 for keyword in self.left_keywords if keyword in text)
-        right_count = sum(1 for keyword in self.right_keywords if keyword in text)
+        # Count each distinct keyword once, as a substring check would
+        found = set(self._keyword_pattern.findall(text))
+        left_count = sum(1 for keyword in found if self._keyword_side[keyword] == 'left')
+        right_count = len(found) - left_count
         
         total_keywords = left_count + right_count
         if total_keywords == 0:
@@ -119,75 +221,132 @@ class BiasAnalyzer:
         }
 
     def _analyze_sentiment(self, text: str) -> Dict[str, float]:
-        """Analyze sentiment using VADER and TextBlob."""
-        # VADER sentiment
+        """Analyze sentiment using VADER."""
         vader_scores = self.vader_analyzer.polarity_scores(text)
         
-        # TextBlob sentiment
-        blob = TextBlob(text)
-        textblob_polarity = blob.sentiment.polarity
-        textblob_subjectivity = blob.sentiment.subjectivity
-        
         return {
             'vader_positive': vader_scores['pos'],
             'vader_negative': vader_scores['neg'],
             'vader_neutral': vader_scores['neu'],
-            'vader_compound': vader_scores['compound'],
-            'textblob_polarity': textblob_polarity,
-            'textblob_subjectivity': textblob_subjectivity
+            'vader_compound': vader_scores['compound']
         }
 
     def _load_bias_model(self):
         """Load the bias classification model only when needed."""
         if self._model_loaded:
             return
+        
+        # Concurrent requests must not each load their own copy of the model
+        with self._model_lock:
+            if self._model_loaded:
+                return
             
-        try:
-            logger.info("Loading bias classification model...")
-            # Use a lighter model for memory efficiency
-            self.bias_classifier = pipeline(
-                "text-classification",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                device=0 if self.device == "cuda" else -1
-            )
-            self._model_loaded = True
-            logger.info("Loaded bias classification model")
-        except Exception as e:
-            logger.warning(f"Could not load bias model: {e}")
-            self.bias_classifier = None
+            if self.device == "cpu":
+                try:
+                    logger.info("Loading ONNX Runtime bias classification model...")
+                    self.bias_classifier = self._load_onnx_classifier()
+                    self._model_loaded = True
+                    logger.info("Loaded ONNX Runtime bias classification model")
+                    return
+                except Exception as e:
+                    logger.warning(f"ONNX Runtime model unavailable, using PyTorch: {e}")
+            
+            try:
+                logger.info("Loading bias classification model...")
+                # Use a lighter model for memory efficiency
+                self.bias_classifier = pipeline(
+                    "text-classification",
+                    model=BIAS_MODEL_NAME,
+                    device=0 if self.device == "cuda" else -1,
+                    torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
+                )
+                logger.info("Loaded bias classification model")
+            except Exception as e:
+                logger.warning(f"Could not load bias model: {e}")
+                self.bias_classifier = None
             self._model_loaded = True
 
+    def _load_onnx_classifier(self):
+        """Build a pipeline on an int8 ONNX Runtime export of the bias model.
+        
+        The model is exported and dynamically quantized on first use, then
+        reused from ONNX_MODEL_DIR on later starts. The export is built in a
+        temporary directory and moved into place when complete, so workers
+        starting together never load a half-written model.
+        """
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        
+        def export(save_dir: Path):
+            logger.info("Exporting bias model to ONNX and quantizing to int8...")
+            onnx_model = ORTModelForSequenceClassification.from_pretrained(
+                BIAS_MODEL_NAME, export=True
+            )
+            quantizer = ORTQuantizer.from_pretrained(onnx_model)
+            quantization_config = AutoQuantizationConfig.avx512_vnni(
+                is_static=False, per_channel=False
+            )
+            quantizer.quantize(save_dir=save_dir, quantization_config=quantization_config)
+        
+        build_model_dir(ONNX_MODEL_DIR, export)
+        model = ORTModelForSequenceClassification.from_pretrained(
+            ONNX_MODEL_DIR, file_name="model_quantized.onnx"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(BIAS_MODEL_NAME)
+        return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
     def _analyze_with_model(self, text: str) -> Dict[str, float]:
         """Analyze using transformer model if available."""
+        return self._analyze_with_model_batch([text])[0]
+
+    def _run_classifier(self, texts: List[str]) -> List[Dict[str, any]]:
+        """Run the loaded classifier over texts in batches."""
+        return self.bias_classifier(
+            texts,
+            batch_size=MODEL_BATCH_SIZE,
+            truncation=True,
+            max_length=512
+        )
+
+    def _analyze_with_model_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Analyze several texts with one batched transformer call.
+        
+        If the classifier call fails, every result carries an 'error' key
+        alongside the neutral defaults.
+        """
         # Load model only when needed
         self._load_bias_model()
         
-        if not self.bias_classifier:
-            return {'model_score': 0.0, 'model_confidence': 0.0}
+        default = {'model_score': 0.0, 'model_confidence': 0.0}
+        if not self.bias_classifier or not texts:
+            return [dict(default) for _ in texts]
         
         try:
             # Truncate text if too long
             max_length = 512
-            if len(text) > max_length:
-                text = text[:max_length]
-            
-            result = self.bias_classifier(text)
+            truncated = [text[:max_length] for text in texts]
             
-            # Convert sentiment to bias proxy
-            if result[0]['label'] == 'LABEL_0':  # Negative
-                model_score = -0.5
-            elif result[0]['label'] == 'LABEL_1':  # Neutral
-                model_score = 0.0
-            else:  # Positive
-                model_score = 0.5
+            results = self._model_batcher.submit(truncated)
             
-            return {
-                'model_score': model_score,
-                'model_confidence': result[0]['score']
-            }
+            model_results = []
+            for result in results:
+                # Convert sentiment to bias proxy
+                if result['label'] == 'LABEL_0':  # Negative
+                    model_score = -0.5
+                elif result['label'] == 'LABEL_1':  # Neutral
+                    model_score = 0.0
+                else:  # Positive
+                    model_score = 0.5
+                
+                model_results.append({
+                    'model_score': model_score,
+                    'model_confidence': result['score']
+                })
+            return model_results
         except Exception as e:
             logger.error(f"Error in model analysis: {e}")
-            return {'model_score': 0.0, 'model_confidence': 0.0}
+            return [dict(default, error=str(e)) for _ in texts]
 
     def _combine_bias_scores(self, keyword_bias: Dict, sentiment: Dict, model_bias: Dict) -> float:
         """Combine different bias analysis methods into a single score."""
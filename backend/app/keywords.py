@@ -0,0 +1,15 @@
+import re
+from typing import Iterable
+
+def build_keyword_pattern(keywords: Iterable[str], flags: int = 0) -> re.Pattern:
+    """
+    Compile keywords into a single alternation, so a text is scanned once
+    no matter how many keywords there are.
+
+    Longer keywords are tried first, so overlapping phrases ("tax cuts" vs
+    "tax") match in full.
+    """
+    return re.compile(
+        '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)),
+        flags
+    )
@@ -1,13 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.news_fetcher import fetch_articles, fetch_multiple_pages
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.news_fetcher import fetch_articles, close_async_client, stream_multiple_pages
 from app.models import Article, BiasAnalysis, BalancedDietRequest
 from app.bias_analyzer import BiasAnalyzer
 from app.tldr_service import tldr_service
+from app.article_clustering import article_clusterer
 from pathlib import Path
 from dotenv import load_dotenv
-from app.ai_summary import summarize_article
+from app.ai_summary import lexrank_summary, summarize_articles_batch
 import os
+import asyncio
+import hashlib
+import multiprocessing
+import orjson
+from cachetools import LRUCache, TTLCache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
 env_path = Path(__file__).parent.parent / ".env" 
@@ -15,11 +23,48 @@ load_dotenv(dotenv_path=env_path)
 
 NEWS_API_KEY = os.getenv("NEWSAPI_KEY")
 
-app = FastAPI()
+# orjson serializes the article lists much faster than the stdlib json encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Initialize bias analyzer
 bias_analyzer = BiasAnalyzer()
 
+# Extractive summarization is CPU-bound and independent per article. The pool
+# is only used when the embedding model failed to load, so it's created on
+# first use (see _get_summary_executor)
+summary_executor = None
+
+# Threads used for blocking per-article work (asyncio.to_thread)
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4)))
+
+# Per-article summaries keyed by a hash of the content alone, so repeat fetches
+# and syndicated copies skip the model. This is the only summary cache on this
+# path (bias results are memoized inside BiasAnalyzer).
+summary_cache = LRUCache(maxsize=10_000)
+
+# Fully analyzed article lists per category, shared by /articles,
+# /articles/balanced and /bias-stats
+ANALYZED_ARTICLES_TTL = 300  # seconds
+analyzed_articles_cache = TTLCache(maxsize=32, ttl=ANALYZED_ARTICLES_TTL)
+# Analyses currently running, so concurrent requests for a category share one
+_analysis_in_progress = {}
+
+def _get_summary_executor() -> ProcessPoolExecutor:
+    """Create the LexRank process pool on first use."""
+    global summary_executor
+    if summary_executor is None:
+        # Spawn rather than fork: this process already runs torch, tokenizer
+        # and batcher threads, and forking a multithreaded process can deadlock
+        summary_executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return summary_executor
+
+def _summary_key(content: str) -> bytes:
+    """Cache key for an article's summary, which depends only on its content."""
+    return hashlib.blake2b((content or "").encode("utf-8"), digest_size=16).digest()
+
 origins = [
     "http://localhost:5173",
     "https://news-analyzer-frontend.onrender.com",
@@ -34,74 +79,228 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def configure_thread_pool():
+    """Size the default executor used by asyncio.to_thread."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+    )
+
+@app.on_event("startup")
+def preload_models():
+    """Load ML models once per worker so the first request isn't penalized."""
+    bias_analyzer._load_bias_model()
+    article_clusterer._load_models()
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    """Stop worker processes when the server shuts down."""
+    if summary_executor is not None:
+        summary_executor.shutdown(wait=False, cancel_futures=True)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close pooled NewsAPI connections."""
+    await close_async_client()
+
 @app.get("/articles")
-async def get_articles(category: str = "all", include_bias: bool = True):
-    # Fetch articles (limited to 100 for free NewsAPI accounts)
-    articles = fetch_multiple_pages(NEWS_API_KEY, category=category, total_articles=100)
-    summarized_articles = []
+async def get_articles(category: str = "all", include_bias: bool = True, stream: bool = False):
+    # With stream=true, articles are sent as NDJSON (one JSON object per line)
+    # as each batch finishes instead of as a single JSON array at the end
+    if stream:
+        return StreamingResponse(
+            _stream_articles(category, include_bias),
+            media_type="application/x-ndjson"
+        )
     
-    for a in articles:
-        summary = summarize_article(a.get("content", ""), sentence_count=3)
-        
-        article_data = {
-            "title": a.get("title", ""),
-            "source": a.get("source", ""),
-            "summary": summary,
-            "url": a.get("url", "")
-        }
-        
-        # Add bias analysis if requested
-        if include_bias:
-            try:
-                bias_analysis = bias_analyzer.analyze_bias(
-                    a.get("title", ""), 
-                    a.get("content", "")
-                )
-                article_data["bias_analysis"] = bias_analysis
-            except Exception as e:
-                print(f"Error analyzing bias: {e}")
-                article_data["bias_analysis"] = {
-                    "bias_score": 0.0,
-                    "bias_category": "neutral",
-                    "confidence": 0.0,
-                    "details": {"error": str(e)}
-                }
-        
-        summarized_articles.append(article_data)
+    if include_bias:
+        return await get_analyzed_articles(category)
     
-    return summarized_articles
+    # Reuse a finished or running full analysis, but don't start one just to
+    # throw the bias results away
+    category_key = (category or "all").lower()
+    cached = analyzed_articles_cache.get(category_key)
+    if cached is None and category_key in _analysis_in_progress:
+        cached = await asyncio.shield(_analysis_in_progress[category_key])
+    if cached is not None:
+        return [_without_bias(article) for article in cached]
+    
+    analysis_tasks = await _start_article_analysis(category, include_bias=False)
+    results = await asyncio.gather(*analysis_tasks)
+    return [article for batch in results for article in batch]
 
-@app.post("/articles/balanced")
-async def get_balanced_articles(request: BalancedDietRequest):
-    """Get a balanced mix of articles based on political bias."""
-    articles = fetch_multiple_pages(NEWS_API_KEY, category=request.category, total_articles=100)
-    analyzed_articles = []
+def _without_bias(article):
+    """Copy of an analyzed article without its bias_analysis."""
+    return {key: value for key, value in article.items() if key != "bias_analysis"}
+
+async def get_analyzed_articles(category: str = "all"):
+    """
+    Fetch, summarize and bias-analyze a category's articles.
     
-    for a in articles:
-        summary = summarize_article(a.get("content", ""), sentence_count=3)
+    Results are cached for ANALYZED_ARTICLES_TTL seconds, and concurrent
+    callers for the same category wait on a single analysis.
+    
+    Args:
+        category: News category ("all" for top headlines)
         
+    Returns:
+        List of article dictionaries including summary and bias_analysis
+    """
+    category = (category or "all").lower()
+    cached = analyzed_articles_cache.get(category)
+    if cached is not None:
+        return cached
+    
+    task = _analysis_in_progress.get(category)
+    if task is None:
+        task = asyncio.create_task(_analyze_category(category))
+        _analysis_in_progress[category] = task
+        task.add_done_callback(lambda _: _analysis_in_progress.pop(category, None))
+    
+    # Shield the shared task so one client disconnecting doesn't cancel it for the rest
+    return await asyncio.shield(task)
+
+async def _analyze_category(category: str):
+    """Run the full analysis for a category and cache it if nothing failed."""
+    analysis_tasks = await _start_article_analysis(category, include_bias=True)
+    results = await asyncio.gather(*analysis_tasks)
+    articles = [article for batch in results for article in batch]
+    
+    # An empty list means the fetch failed; don't serve that for the full TTL
+    failed = any(_bias_analysis_failed(article["bias_analysis"]) for article in articles)
+    if articles and not failed:
+        analyzed_articles_cache[category] = articles
+    return articles
+
+def _bias_analysis_failed(bias_analysis) -> bool:
+    """Whether the analysis or its model step errored, i.e. it's worth retrying."""
+    details = bias_analysis.get("details", {})
+    return "error" in details or "error" in details.get("model_analysis", {})
+
+async def _start_article_analysis(category: str, include_bias: bool):
+    """Fetch a category's articles and start analyzing each batch as it arrives."""
+    # Fetch articles (limited to 100 for free NewsAPI accounts). Each country's
+    # batch is analyzed as soon as it arrives, overlapping the remaining fetch.
+    analysis_tasks = []
+    async for batch in stream_multiple_pages(NEWS_API_KEY, category=category, total_articles=100):
+        analysis_tasks.append(asyncio.create_task(_analyze_articles(batch, include_bias)))
+    return analysis_tasks
+
+async def _stream_articles(category: str, include_bias: bool):
+    """Yield analyzed articles as NDJSON lines, fastest batch first."""
+    cached = analyzed_articles_cache.get((category or "all").lower())
+    if cached is not None:
+        for article in cached:
+            if not include_bias:
+                article = _without_bias(article)
+            yield orjson.dumps(article) + b"\n"
+        return
+    
+    # Analyze each country's batch as soon as it's fetched, and send each
+    # analyzed batch as soon as it's done, while the fetch is still running
+    batches = stream_multiple_pages(NEWS_API_KEY, category=category, total_articles=100)
+    next_batch = asyncio.ensure_future(batches.__anext__())
+    analysis_tasks = set()
+    try:
+        while next_batch is not None or analysis_tasks:
+            waiting = (analysis_tasks | {next_batch}) if next_batch is not None else analysis_tasks
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                if finished is next_batch:
+                    try:
+                        batch = finished.result()
+                    except StopAsyncIteration:
+                        next_batch = None
+                        continue
+                    analysis_tasks.add(asyncio.create_task(_analyze_articles(batch, include_bias)))
+                    next_batch = asyncio.ensure_future(batches.__anext__())
+                else:
+                    analysis_tasks.discard(finished)
+                    for article in finished.result():
+                        yield orjson.dumps(article) + b"\n"
+    finally:
+        # The client may disconnect mid-stream; stop fetching and analyzing for it
+        outstanding = [task for task in (next_batch, *analysis_tasks) if task is not None]
+        for task in outstanding:
+            task.cancel()
+        await asyncio.gather(*outstanding, return_exceptions=True)
+        await batches.aclose()
+
+async def _analyze_articles(articles, include_bias: bool):
+    """Summarize and optionally bias-analyze a batch of fetched articles."""
+    summarized_articles = []
+    
+    keys = [_summary_key(a.content) for a in articles]
+    
+    # Summarize uncached articles without blocking the event loop: one batched
+    # encode with the shared embedding model, or LexRank across processes.
+    # Identical contents in the batch are summarized once.
+    summaries_by_key = {}
+    missing = {}
+    for key, article in zip(keys, articles):
+        if key in summaries_by_key or key in missing:
+            continue
+        summary = summary_cache.get(key)
+        if summary is None:
+            missing[key] = article.content
+        else:
+            summaries_by_key[key] = summary
+    if missing:
+        contents = list(missing.values())
+        if article_clusterer.embedding_model is not None:
+            new_summaries = await asyncio.to_thread(
+                summarize_articles_batch, contents, 3, article_clusterer.embedding_model
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            executor = _get_summary_executor()
+            new_summaries = await asyncio.gather(*[
+                loop.run_in_executor(executor, lexrank_summary, content, 3)
+                for content in contents
+            ])
+        for key, summary in zip(missing, new_summaries):
+            summaries_by_key[key] = summary
+            summary_cache[key] = summary
+    summaries = [summaries_by_key[key] for key in keys]
+    
+    # Run bias analysis for all articles as one batch; cached results are
+    # returned without touching the models
+    bias_results = None
+    if include_bias:
         try:
-            bias_analysis = bias_analyzer.analyze_bias(
-                a.get("title", ""), 
-                a.get("content", "")
+            bias_results = await asyncio.to_thread(
+                bias_analyzer.analyze_bias_batch,
+                [(a.title, a.content) for a in articles]
             )
         except Exception as e:
-            bias_analysis = {
+            print(f"Error analyzing bias: {e}")
+            bias_results = [{
                 "bias_score": 0.0,
                 "bias_category": "neutral",
                 "confidence": 0.0,
                 "details": {"error": str(e)}
-            }
-        
+            } for _ in articles]
+    
+    for i, (a, summary) in enumerate(zip(articles, summaries)):
         article_data = {
-            "title": a.get("title", ""),
-            "source": a.get("source", ""),
+            "title": a.title,
+            "source": a.source,
             "summary": summary,
-            "url": a.get("url", ""),
-            "bias_analysis": bias_analysis
+            "url": a.url
         }
         
-        analyzed_articles.append(article_data)
+        # Add bias analysis if requested
+        if bias_results is not None:
+            article_data["bias_analysis"] = bias_results[i]
+        
+        summarized_articles.append(article_data)
+    
+    return summarized_articles
+
+@app.post("/articles/balanced")
+async def get_balanced_articles(request: BalancedDietRequest):
+    """Get a balanced mix of articles based on political bias."""
+    analyzed_articles = await get_analyzed_articles(request.category)
     
     # Get balanced selection
     balanced_articles = bias_analyzer.get_balanced_articles(
@@ -121,32 +320,26 @@ async def get_balanced_articles(request: BalancedDietRequest):
 @app.get("/bias-stats")
 async def get_bias_statistics(category: str = "all"):
     """Get bias statistics for articles in a category."""
-    articles = fetch_multiple_pages(NEWS_API_KEY, category=category, total_articles=100)
+    articles = await get_analyzed_articles(category)
     bias_stats = {"left-leaning": 0, "neutral": 0, "right-leaning": 0}
     
-    for a in articles:  # Analyze all available articles for stats
-        try:
-            bias_analysis = bias_analyzer.analyze_bias(
-                a.get("title", ""), 
-                a.get("content", "")
-            )
-            category = bias_analysis.get("bias_category", "neutral")
-            if category in bias_stats:
-                bias_stats[category] += 1
-        except Exception as e:
-            bias_stats["neutral"] += 1
+    for article in articles:
+        bias_category = article["bias_analysis"].get("bias_category", "neutral")
+        if bias_category in bias_stats:
+            bias_stats[bias_category] += 1
     
-        return {
-            "category": category,
-            "bias_distribution": bias_stats,
-            "total_analyzed": sum(bias_stats.values())
-        }
+    return {
+        "category": category,
+        "bias_distribution": bias_stats,
+        "total_analyzed": sum(bias_stats.values())
+    }
 
 @app.get("/tldr/{category}")
 async def get_category_tldr(category: str = "all", force_refresh: bool = False):
     """Get TL;DR summary for a specific category."""
     try:
-        result = tldr_service.get_category_tldr(category, force_refresh)
+        # Clustering and summarization block, so keep them off the event loop
+        result = await asyncio.to_thread(tldr_service.get_category_tldr, category, force_refresh)
         return result
     except Exception as e:
         return {
@@ -162,7 +355,9 @@ async def get_category_tldr(category: str = "all", force_refresh: bool = False):
 async def get_all_tldr(force_refresh: bool = False):
     """Get TL;DR summaries for all categories."""
     try:
-        result = tldr_service.get_all_categories_tldr(force_refresh=force_refresh)
+        result = await asyncio.to_thread(
+            tldr_service.get_all_categories_tldr, force_refresh=force_refresh
+        )
         return result
     except Exception as e:
         return {
@@ -178,7 +373,10 @@ async def get_all_tldr(force_refresh: bool = False):
 async def get_trending_topics(category: str = "all", min_cluster_size: int = 3):
     """Get trending topics for a category."""
     try:
-        trending = tldr_service.get_trending_topics(category, min_cluster_size)
+        # Regenerates the category's TL;DR, so keep it off the event loop too
+        trending = await asyncio.to_thread(
+            tldr_service.get_trending_topics, category, min_cluster_size
+        )
         return {
             "category": category,
             "trending_topics": trending,
@@ -1,14 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.news_fetcher import fetch_articles, fetch_multiple_pages
+from fastapi.responses import ORJSONResponse
+from app.news_fetcher import fetch_articles, fetch_multiple_pages_async, close_async_client
 from app.models import Article, BiasAnalysis, BalancedDietRequest
 from app.tldr_service import tldr_service
 from pathlib import Path
 from dotenv import load_dotenv
 from app.ai_summary import summarize_article
+from app.keywords import build_keyword_pattern
 import os
+import asyncio
+import numpy as np
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
+import hashlib
+import re
+import threading
+from cachetools import LRUCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,61 +29,126 @@ load_dotenv(dotenv_path=env_path)
 
 NEWS_API_KEY = os.getenv("NEWSAPI_KEY")
 
-app = FastAPI()
+# Threads used for blocking per-article work (asyncio.to_thread)
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4)))
+# Maximum per-article tasks running at once within a request
+ARTICLE_CONCURRENCY = 16
+# Number of analyzed articles remembered by (title, content)
+BIAS_CACHE_SIZE = 4096
+
+# Bias categories indexed by the analyzer's vectorized classification
+BIAS_CATEGORIES = ('left-leaning', 'neutral', 'right-leaning')
+
+# Trending-topic tokens are words of 4+ letters; STOP_WORDS only needs
+# entries that long
+_TOKEN_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+STOP_WORDS = frozenset({
+    'this', 'that', 'with', 'from', 'they', 'have', 'been', 'will', 'said', 'more',
+    'than', 'also', 'each', 'which', 'their', 'time', 'very', 'when', 'much',
+    'some', 'these', 'other', 'after', 'first', 'well', 'year', 'work', 'such',
+    'make', 'over', 'think', 'back', 'where', 'before', 'move', 'right', 'same',
+    'there', 'word', 'about', 'many', 'then', 'them', 'only', 'what', 'through',
+    'good', 'want', 'because', 'give', 'most'
+})
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Simple bias analyzer without heavy ML models
 class SimpleBiasAnalyzer:
     def __init__(self):
-        self.left_keywords = [
+        self.left_keywords = (
             'progressive', 'liberal', 'democrat', 'social justice', 'equality',
             'climate change', 'renewable energy', 'healthcare reform', 'minimum wage',
             'gun control', 'immigration reform', 'diversity', 'inclusion',
             'environmental protection', 'green energy', 'social welfare'
-        ]
+        )
         
-        self.right_keywords = [
+        self.right_keywords = (
             'conservative', 'republican', 'traditional values', 'free market',
             'small government', 'tax cuts', 'deregulation', 'law and order',
             'national security', 'border security', 'family values', 'religious freedom',
             'fiscal responsibility', 'entrepreneurship', 'individual liberty'
-        ]
-    
-    def analyze_bias(self, title: str, content: str):
-        """Simple keyword-based bias analysis."""
-        text = f"{title} {content}".lower()
-        
-        left_count = sum(1 for keyword in self.left_keywords if keyword in text)
-        right_count = sum(1 for keyword in self.right_keywords if keyword in text)
-        
-        total_keywords = left_count + right_count
-        if total_keywords == 0:
-            return {
-                'bias_score': 0.0,
-                'bias_category': 'neutral',
-                'confidence': 0.0,
-                'details': {'method': 'keyword-based', 'keywords_found': 0}
-            }
+        )
         
-        bias_score = (right_count - left_count) / total_keywords
+        # Matched case-insensitively, so texts don't need lowercasing first
+        self._left_keyword_set = frozenset(self.left_keywords)
+        self._keyword_pattern = build_keyword_pattern(
+            self.left_keywords + self.right_keywords, re.IGNORECASE
+        )
         
-        if bias_score < -0.2:
-            category = 'left-leaning'
-        elif bias_score > 0.2:
-            category = 'right-leaning'
-        else:
-            category = 'neutral'
+        # Results for articles already analyzed, shared across endpoints.
+        # LRUCache isn't thread-safe and analysis runs in worker threads.
+        self._result_cache = LRUCache(maxsize=BIAS_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
+    
+    def analyze_bias(self, title: str, content: str):
+        """Simple keyword-based bias analysis, memoized by title and content."""
+        return self.analyze_bias_batch([(title, content)])[0]
+    
+    def analyze_bias_batch(self, items):
+        """
+        Keyword-based bias analysis for several (title, content) pairs.
+        
+        Keyword counts are gathered per article, then scores, categories and
+        confidences are computed for the whole batch with numpy.
+        """
+        keys = [
+            hashlib.blake2b(f"{title}\0{content}".encode("utf-8"), digest_size=16).digest()
+            for title, content in items
+        ]
+        with self._cache_lock:
+            results = [self._result_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        counts = np.array(
+            [self._count_keywords(*items[i]) for i in missing], dtype=np.int64
+        ).reshape(-1, 2)
+        left_counts, right_counts = counts[:, 0], counts[:, 1]
+        totals = left_counts + right_counts
+        
+        scores = (right_counts - left_counts) / np.maximum(totals, 1)
+        categories = np.where(scores < -0.2, 0, np.where(scores > 0.2, 2, 1))
+        confidences = np.minimum(1.0, totals / 10.0)
+        
+        for i, left_count, right_count, total_keywords, bias_score, category, confidence in zip(
+            missing, left_counts.tolist(), right_counts.tolist(), totals.tolist(),
+            scores.tolist(), categories.tolist(), confidences.tolist()
+        ):
+            if total_keywords == 0:
+                results[i] = {
+                    'bias_score': 0.0,
+                    'bias_category': 'neutral',
+                    'confidence': 0.0,
+                    'details': {'method': 'keyword-based', 'keywords_found': 0}
+                }
+            else:
+                results[i] = {
+                    'bias_score': bias_score,
+                    'bias_category': BIAS_CATEGORIES[category],
+                    'confidence': confidence,
+                    'details': {
+                        'method': 'keyword-based',
+                        'left_keywords': left_count,
+                        'right_keywords': right_count,
+                        'total_keywords': total_keywords
+                    }
+                }
         
-        return {
-            'bias_score': bias_score,
-            'bias_category': category,
-            'confidence': min(1.0, total_keywords / 10.0),
-            'details': {
-                'method': 'keyword-based',
-                'left_keywords': left_count,
-                'right_keywords': right_count,
-                'total_keywords': total_keywords
-            }
-        }
+        with self._cache_lock:
+            for i in missing:
+                self._result_cache[keys[i]] = results[i]
+        return results
+    
+    def _count_keywords(self, title: str, content: str):
+        """Count the distinct left and right keywords an article mentions."""
+        text = f"{title} {content}"
+        
+        # Count each distinct keyword once, as a substring check would
+        found = {keyword.lower() for keyword in self._keyword_pattern.findall(text)}
+        left_count = len(found & self._left_keyword_set)
+        return left_count, len(found) - left_count
     
     def get_balanced_articles(self, articles, target_balance=None):
         """Simple balanced article selection."""
@@ -98,6 +173,24 @@ class SimpleBiasAnalyzer:
 # Initialize simple bias analyzer
 bias_analyzer = SimpleBiasAnalyzer()
 
+def _analyze_bias_safely(title: str, content: str):
+    """Run bias analysis, falling back to a neutral result on error."""
+    try:
+        return bias_analyzer.analyze_bias(title, content)
+    except Exception as e:
+        logger.error(f"Error analyzing bias: {e}")
+        return {
+            "bias_score": 0.0,
+            "bias_category": "neutral",
+            "confidence": 0.0,
+            "details": {"error": str(e)}
+        }
+
+async def _to_thread_bounded(semaphore: asyncio.Semaphore, func, *args):
+    """Run a blocking call in the thread pool, limited by the semaphore."""
+    async with semaphore:
+        return await asyncio.to_thread(func, *args)
+
 origins = [
     "http://localhost:5173",
     "https://news-analyzer-frontend.onrender.com",
@@ -112,44 +205,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def configure_thread_pool():
+    """Size the default executor used by asyncio.to_thread."""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+    )
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close pooled NewsAPI connections."""
+    await close_async_client()
+
 @app.get("/articles")
 async def get_articles(category: str = "all", include_bias: bool = True):
     """Get articles with optional bias analysis."""
     try:
         # Fetch articles (limited to 50 for free tier)
-        articles = fetch_multiple_pages(NEWS_API_KEY, category=category, total_articles=50)
-        summarized_articles = []
+        articles = await fetch_multiple_pages_async(
+            NEWS_API_KEY, category=category, total_articles=50
+        )
+        semaphore = asyncio.Semaphore(ARTICLE_CONCURRENCY)
         
-        for a in articles:
-            summary = summarize_article(a.get("content", ""), sentence_count=3)
+        async def process_one(a):
+            summary_task = _to_thread_bounded(semaphore, summarize_article, a.content, 3)
+            if include_bias:
+                # Add simple bias analysis if requested
+                summary, bias_analysis = await asyncio.gather(
+                    summary_task,
+                    _to_thread_bounded(semaphore, _analyze_bias_safely, a.title, a.content)
+                )
+            else:
+                summary = await summary_task
             
             article_data = {
-                "title": a.get("title", ""),
-                "source": a.get("source", ""),
+                "title": a.title,
+                "source": a.source,
                 "summary": summary,
-                "url": a.get("url", "")
+                "url": a.url
             }
-            
-            # Add simple bias analysis if requested
             if include_bias:
-                try:
-                    bias_analysis = bias_analyzer.analyze_bias(
-                        a.get("title", ""), 
-                        a.get("content", "")
-                    )
-                    article_data["bias_analysis"] = bias_analysis
-                except Exception as e:
-                    logger.error(f"Error analyzing bias: {e}")
-                    article_data["bias_analysis"] = {
-                        "bias_score": 0.0,
-                        "bias_category": "neutral",
-                        "confidence": 0.0,
-                        "details": {"error": str(e)}
-                    }
-            
-            summarized_articles.append(article_data)
+                article_data["bias_analysis"] = bias_analysis
+            return article_data
         
-        return summarized_articles
+        return await asyncio.gather(*[process_one(a) for a in articles])
         
     except Exception as e:
         logger.error(f"Error fetching articles: {e}")
@@ -159,34 +258,32 @@ async def get_articles(category: str = "all", include_bias: bool = True):
 async def get_balanced_articles(request: BalancedDietRequest):
     """Get a balanced mix of articles based on political bias."""
     try:
-        articles = fetch_multiple_pages(NEWS_API_KEY, category=request.category, total_articles=50)
-        analyzed_articles = []
+        articles = await fetch_multiple_pages_async(
+            NEWS_API_KEY, category=request.category, total_articles=50
+        )
+        semaphore = asyncio.Semaphore(ARTICLE_CONCURRENCY)
+        
+        # Summaries per article in worker threads; bias for all articles in one batch
+        summaries, bias_results = await asyncio.gather(
+            asyncio.gather(*[
+                _to_thread_bounded(semaphore, summarize_article, a.content, 3)
+                for a in articles
+            ]),
+            asyncio.to_thread(
+                bias_analyzer.analyze_bias_batch, [(a.title, a.content) for a in articles]
+            )
+        )
         
-        for a in articles:
-            summary = summarize_article(a.get("content", ""), sentence_count=3)
-            
-            try:
-                bias_analysis = bias_analyzer.analyze_bias(
-                    a.get("title", ""), 
-                    a.get("content", "")
-                )
-            except Exception as e:
-                bias_analysis = {
-                    "bias_score": 0.0,
-                    "bias_category": "neutral",
-                    "confidence": 0.0,
-                    "details": {"error": str(e)}
-                }
-            
-            article_data = {
-                "title": a.get("title", ""),
-                "source": a.get("source", ""),
+        analyzed_articles = [
+            {
+                "title": a.title,
+                "source": a.source,
                 "summary": summary,
-                "url": a.get("url", ""),
+                "url": a.url,
                 "bias_analysis": bias_analysis
             }
-            
-            analyzed_articles.append(article_data)
+            for a, summary, bias_analysis in zip(articles, summaries, bias_results)
+        ]
         
         # Get balanced selection
         balanced_articles = bias_analyzer.get_balanced_articles(
@@ -211,20 +308,20 @@ async def get_balanced_articles(request: BalancedDietRequest):
 async def get_bias_statistics(category: str = "all"):
     """Get bias statistics for articles in a category."""
     try:
-        articles = fetch_multiple_pages(NEWS_API_KEY, category=category, total_articles=50)
+        articles = await fetch_multiple_pages_async(
+            NEWS_API_KEY, category=category, total_articles=50
+        )
         bias_stats = {"left-leaning": 0, "neutral": 0, "right-leaning": 0}
         
-        for a in articles:
-            try:
-                bias_analysis = bias_analyzer.analyze_bias(
-                    a.get("title", ""), 
-                    a.get("content", "")
-                )
-                category_name = bias_analysis.get("bias_category", "neutral")
-                if category_name in bias_stats:
-                    bias_stats[category_name] += 1
-            except Exception as e:
-                bias_stats["neutral"] += 1
+        # Analyze and categorize every article in one batch
+        bias_results = await asyncio.to_thread(
+            bias_analyzer.analyze_bias_batch, [(a.title, a.content) for a in articles]
+        )
+        
+        for bias_analysis in bias_results:
+            category_name = bias_analysis.get("bias_category", "neutral")
+            if category_name in bias_stats:
+                bias_stats[category_name] += 1
         
         return {
             "category": category,
@@ -241,7 +338,9 @@ async def get_category_tldr(category: str = "all", force_refresh: bool = False):
     """Get TL;DR summary for a specific category (simplified version)."""
     try:
         # For lite version, return a simple summary without clustering
-        articles = fetch_multiple_pages(NEWS_API_KEY, category=category, total_articles=20)
+        articles = await fetch_multiple_pages_async(
+            NEWS_API_KEY, category=category, total_articles=20
+        )
         
         if not articles:
             return {
@@ -253,15 +352,20 @@ async def get_category_tldr(category: str = "all", force_refresh: bool = False):
                 "note": "Lite version - no clustering"
             }
         
-        # Create simple summaries
+        # Create simple summaries in worker threads so other categories'
+        # requests keep running
+        top_articles = articles[:5]  # Top 5 articles
+        article_summaries = await asyncio.gather(*[
+            asyncio.to_thread(summarize_article, article.content, 2)
+            for article in top_articles
+        ])
         summaries = []
-        for i, article in enumerate(articles[:5]):  # Top 5 articles
-            summary = summarize_article(article.get("content", ""), sentence_count=2)
+        for article, summary in zip(top_articles, article_summaries):
             summaries.append({
-                "title": article.get("title", ""),
+                "title": article.title,
                 "summary": summary,
-                "url": article.get("url", ""),
-                "source": article.get("source", "")
+                "url": article.url,
+                "source": article.source
             })
         
         return {
@@ -298,8 +402,12 @@ async def get_all_tldr(force_refresh: bool = False):
             "note": "Lite version - simplified processing"
         }
         
-        for category in categories:
-            category_result = await get_category_tldr(category, force_refresh)
+        # Fetch and summarize all categories concurrently
+        category_results = await asyncio.gather(*[
+            get_category_tldr(category, force_refresh) for category in categories
+        ])
+        
+        for category, category_result in zip(categories, category_results):
             result["categories"][category] = category_result
             result["total_articles"] += category_result.get("total_articles", 0)
             result["total_clusters"] += category_result.get("total_clusters", 0)
@@ -321,24 +429,19 @@ async def get_all_tldr(force_refresh: bool = False):
 async def get_trending_topics(category: str = "all", min_cluster_size: int = 3):
     """Get trending topics for a category (simplified version)."""
     try:
-        articles = fetch_multiple_pages(NEWS_API_KEY, category=category, total_articles=30)
-        
-        # Simple keyword extraction for trending topics
-        from collections import Counter
-        import re
-        
-        all_words = []
-        for article in articles:
-            title = article.get("title", "").lower()
-            words = re.findall(r'\b[a-zA-Z]{4,}\b', title)
-            all_words.extend(words)
+        articles = await fetch_multiple_pages_async(
+            NEWS_API_KEY, category=category, total_articles=30
+        )
         
-        # Filter out common words
-        stop_words = {'this', 'that', 'with', 'from', 'they', 'have', 'been', 'will', 'said', 'more', 'than', 'also', 'each', 'which', 'their', 'time', 'very', 'when', 'much', 'new', 'some', 'these', 'may', 'other', 'after', 'first', 'well', 'year', 'work', 'such', 'make', 'over', 'think', 'also', 'back', 'where', 'much', 'before', 'move', 'right', 'boy', 'old', 'too', 'same', 'she', 'all', 'there', 'when', 'up', 'use', 'word', 'how', 'said', 'an', 'each', 'which', 'do', 'their', 'time', 'if', 'will', 'about', 'out', 'many', 'then', 'them', 'can', 'only', 'other', 'new', 'some', 'what', 'time', 'very', 'when', 'much', 'get', 'through', 'back', 'much', 'before', 'go', 'good', 'new', 'want', 'because', 'any', 'these', 'give', 'day', 'most', 'us'}
+        # Simple keyword extraction for trending topics.
+        # Tokenize every title in one regex pass; newlines keep words from
+        # running together across titles
+        titles = "\n".join(article.title for article in articles).lower()
         
-        word_counts = Counter(all_words)
+        # Filter out common words before counting
+        word_counts = Counter(word for word in _TOKEN_RE.findall(titles) if word not in STOP_WORDS)
         trending = [word for word, count in word_counts.most_common(10) 
-                   if word not in stop_words and count >= min_cluster_size]
+                   if count >= min_cluster_size]
         
         return {
             "category": category,
@@ -0,0 +1,37 @@
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+def build_model_dir(target: Path, build: Callable[[Path], None]) -> None:
+    """
+    Build a model cache directory so other processes never see it half-written.
+
+    build(tmp_dir) writes the files into a temporary directory next to target,
+    which is then renamed into place in one step. If another worker published
+    target first, its copy is kept and ours is discarded.
+
+    Args:
+        target: Directory to create, e.g. an exported ONNX model
+        build: Writes the directory's contents into the path it's given
+    """
+    if target.exists():
+        return
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{target.name}-", dir=target.parent))
+    try:
+        build(tmp_dir)
+        try:
+            os.replace(tmp_dir, target)
+        except OSError:
+            # Renaming onto an existing, non-empty directory fails
+            if not target.exists():
+                raise
+            logger.info(f"{target} was built by another process; using that copy")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
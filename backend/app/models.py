@@ -1,6 +1,18 @@
 from pydantic import BaseModel
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 
+@dataclass
+class RawArticle:
+    """An article as fetched from NewsAPI, before summarization and analysis."""
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ("title", "url", "source", "content")
+
+    title: str
+    url: str
+    source: str
+    content: str
+
 class Article(BaseModel):
     title: str
     url: str
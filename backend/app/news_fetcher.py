@@ -1,4 +1,163 @@
+import asyncio
+import threading
+import time
+import httpx
+import orjson
 import requests
+from cachetools import LRUCache, TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.models import RawArticle
+
+NEWSAPI_URL = "https://newsapi.org/v2/top-headlines"
+# Countries fetched for every request, in priority order
+COUNTRIES = ("us", "ca")
+
+# De-duplicated article lists keyed by (category, total_articles), so the
+# endpoints a single page view hits share one upstream fetch
+ARTICLES_CACHE_TTL = 300  # seconds
+_articles_cache = TTLCache(maxsize=64, ttl=ARTICLES_CACHE_TTL)
+_articles_cache_lock = threading.Lock()
+
+# Last ETag and response body per request, for conditional GETs
+_etag_cache = LRUCache(maxsize=128)
+_etag_cache_lock = threading.Lock()
+
+# Shared async client so connections (and TLS sessions) are reused across requests
+_async_client = httpx.AsyncClient(
+    http2=True,
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+# Cap on synchronous NewsAPI requests in flight at once, so parallel
+# TL;DR category refreshes don't burst past NewsAPI's rate limits
+NEWSAPI_MAX_CONCURRENT_REQUESTS = 4
+_sync_request_slots = threading.BoundedSemaphore(NEWSAPI_MAX_CONCURRENT_REQUESTS)
+
+# Synchronous requests are also spaced out to at most this many per second
+NEWSAPI_MAX_REQUESTS_PER_SECOND = 5
+_request_interval = 1.0 / NEWSAPI_MAX_REQUESTS_PER_SECOND
+_next_request_at = 0.0
+_request_rate_lock = threading.Lock()
+
+# Shared session for the synchronous fetchers (used by TLDRService), so they
+# reuse pooled keep-alive connections instead of a new one per call. Every
+# request goes to one host, so a single pool sized to the request cap is
+# enough; rate-limit (429) and transient 5xx responses are retried with
+# exponential backoff, waiting as long as Retry-After asks when it's sent.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=NEWSAPI_MAX_CONCURRENT_REQUESTS,
+    pool_block=True,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+))
+_session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+
+def _wait_for_request_slot():
+    """Block until the next request fits under NEWSAPI_MAX_REQUESTS_PER_SECOND."""
+    global _next_request_at
+    with _request_rate_lock:
+        now = time.monotonic()
+        delay = _next_request_at - now
+        _next_request_at = max(now, _next_request_at) + _request_interval
+    if delay > 0:
+        time.sleep(delay)
+
+def _get_sync(params, cached):
+    """GET NewsAPI through the shared session, within the concurrency and rate caps."""
+    with _sync_request_slots:
+        _wait_for_request_slot()
+        return _session.get(
+            NEWSAPI_URL, params=params, headers=_conditional_headers(cached), timeout=10
+        )
+
+async def _get_async(params):
+    """GET NewsAPI through the shared async client and decode the response."""
+    cached = _cached_response(params)
+    response = await _async_client.get(
+        NEWSAPI_URL, params=params, headers=_conditional_headers(cached)
+    )
+    return _response_data(params, response, cached)
+
+async def close_async_client():
+    """Close the shared async client's pooled connections."""
+    await _async_client.aclose()
+
+def _build_params(api_key, category, page_size, page):
+    """Build NewsAPI query parameters (without the country)."""
+    params = {
+        "apiKey": api_key,
+        "pageSize": page_size,
+        "page": page,
+    }
+
+    if category and category.lower() != "all":
+        params["category"] = category.lower()
+
+    return params
+
+def _articles_cache_key(category, total_articles):
+    return ((category or "all").lower(), total_articles)
+
+def _get_cached_articles(category, total_articles):
+    """Return a copy of the cached article list, or None on a miss."""
+    with _articles_cache_lock:
+        articles = _articles_cache.get(_articles_cache_key(category, total_articles))
+    return list(articles) if articles is not None else None
+
+def _set_cached_articles(category, total_articles, articles):
+    with _articles_cache_lock:
+        _articles_cache[_articles_cache_key(category, total_articles)] = list(articles)
+
+def _request_key(params):
+    """Identify a request by its parameters, excluding the API key."""
+    return tuple(sorted((key, value) for key, value in params.items() if key != "apiKey"))
+
+def _cached_response(params):
+    """The stored (etag, body) for a request, or None."""
+    with _etag_cache_lock:
+        return _etag_cache.get(_request_key(params))
+
+def _conditional_headers(cached):
+    """If-None-Match header for a request we've stored a response for."""
+    return {"If-None-Match": cached[0]} if cached else {}
+
+def _response_data(params, response, cached):
+    """
+    Decode a NewsAPI response, reusing the stored body on 304 Not Modified.
+    cached is the entry the conditional headers were built from, so a 304
+    can still be answered if it has since been evicted from _etag_cache.
+    """
+    if response.status_code == 304 and cached:
+        return cached[1]
+
+    # orjson decodes the article payloads several times faster than stdlib json
+    data = orjson.loads(response.content)
+    etag = response.headers.get("ETag")
+    if etag and data.get("status") == "ok":
+        with _etag_cache_lock:
+            _etag_cache[_request_key(params)] = (etag, data)
+    return data
+
+def _parse_articles(data):
+    """Convert a NewsAPI response body into RawArticle objects."""
+    return [
+        RawArticle(
+            title=item.get("title", "No title"),
+            url=item.get("url", ""),
+            source=item.get("source", {}).get("name", ""),
+            content=item.get("content") or item.get("description", "")
+        )
+        for item in data.get("articles", [])
+    ]
 
 def fetch_articles(api_key, category=None, page_size=100, page=1):
     """
@@ -7,69 +166,181 @@ def fetch_articles(api_key, category=None, page_size=100, page=1):
     - page_size: number of articles per request (max 100)
     - page: which page of results to fetch
     """
+    return _fetch_countries(api_key, category, page_size, page)[0]
+
+def _fetch_countries(api_key, category, page_size, page):
+    """
+    Fetch every country in turn.
+    Returns (articles, complete), where complete is False if any request failed.
+    """
     # Use 'top-headlines' endpoint with US and Canada
-    url = f"https://newsapi.org/v2/top-headlines"
-    params = {
-        "apiKey": api_key,
-        "pageSize": page_size,
-        "page": page,
-        "country": "us"  # Start with US
-    }
+    params = _build_params(api_key, category, page_size, page)
 
-    if category and category.lower() != "all":
-        params["category"] = category.lower()
+    articles = []
+    for country in COUNTRIES:
+        params["country"] = country
+        cached = _cached_response(params)
+        data = _response_data(params, _get_sync(params, cached), cached)
 
-    response = requests.get(url, params=params)
-    data = response.json()
-    
-    if data.get("status") != "ok":
-        print("NewsAPI error:", data)
-        return []
+        if data.get("status") != "ok":
+            print("NewsAPI error:", data)
+            return articles, False
+
+        articles.extend(_parse_articles(data))
+
+    return articles, True
+
+async def _fetch_countries_async(api_key, category, page_size, page):
+    """
+    Async counterpart of _fetch_countries that requests every country concurrently.
+    Returns (articles, complete), where complete is False if any request failed.
+    """
+    params = _build_params(api_key, category, page_size, page)
+    responses = await asyncio.gather(*[
+        _get_async({**params, "country": country}) for country in COUNTRIES
+    ])
 
     articles = []
-    for item in data.get("articles", []):
-        articles.append({
-            "title": item.get("title", "No title"),
-            "url": item.get("url", ""),
-            "source": item.get("source", {}).get("name", ""),
-            "content": item.get("content") or item.get("description", "")
-        })
-    
-    # Also fetch from Canada
-    params["country"] = "ca"
-    response_ca = requests.get(url, params=params)
-    data_ca = response_ca.json()
-    
-    if data_ca.get("status") == "ok":
-        for item in data_ca.get("articles", []):
-            articles.append({
-                "title": item.get("title", "No title"),
-                "url": item.get("url", ""),
-                "source": item.get("source", {}).get("name", ""),
-                "content": item.get("content") or item.get("description", "")
-            })
-    
-    return articles
+    complete = True
+    for data in responses:
+        if data.get("status") != "ok":
+            print("NewsAPI error:", data)
+            complete = False
+            continue
 
-def fetch_multiple_pages(api_key, category=None, total_articles=100):
+        articles.extend(_parse_articles(data))
+
+    return articles, complete
+
+async def _stream_countries(api_key, category, page_size, page):
     """
-    Fetch articles from NewsAPI (US and Canada, limited to 100 for free accounts).
-    - total_articles: number of articles to fetch (max 100 for free accounts)
+    Yield each country's articles as its response arrives, or None for a
+    country whose request failed.
     """
-    # Fetch from both US and Canada (this might exceed 100, but we'll limit it)
-    articles = fetch_articles(api_key, category=category, page_size=50, page=1)  # 50 from each country
-    
-    # Remove duplicates based on title and source
+    params = _build_params(api_key, category, page_size, page)
+    requests_in_flight = [
+        asyncio.create_task(_get_async({**params, "country": country})) for country in COUNTRIES
+    ]
+
+    try:
+        for finished in asyncio.as_completed(requests_in_flight):
+            data = await finished
+
+            if data.get("status") != "ok":
+                print("NewsAPI error:", data)
+                yield None
+                continue
+
+            yield _parse_articles(data)
+    finally:
+        # The consumer may stop early (article limit, client disconnect); don't
+        # leave the other countries' requests running or their errors unretrieved
+        for task in requests_in_flight:
+            task.cancel()
+        await asyncio.gather(*requests_in_flight, return_exceptions=True)
+
+def _is_new_article(article, seen_articles):
+    """Check an article against already-seen title/source pairs, recording it if new."""
+    title = article.title
+    if not title:
+        return False
+    # Tuple keys can't collide the way "title_source" strings could; the title
+    # is normalized so case and spacing differences between feeds still match
+    article_key = (" ".join(title.split()).casefold(), article.source)
+    if article_key in seen_articles:
+        return False
+    seen_articles.add(article_key)
+    return True
+
+def _dedupe_articles(articles):
+    """Remove duplicates based on title and source."""
     seen_articles = set()
     unique_articles = []
     
     for article in articles:
-        article_key = f"{article.get('title', '')}_{article.get('source', '')}"
-        if article_key not in seen_articles and article.get('title'):
-            seen_articles.add(article_key)
+        if _is_new_article(article, seen_articles):
             unique_articles.append(article)
             # Limit to 100 articles total for free account
             if len(unique_articles) >= 100:
                 break
     
     return unique_articles
+
+def fetch_multiple_pages(api_key, category=None, total_articles=100):
+    """
+    Fetch articles from NewsAPI (US and Canada, limited to 100 for free accounts).
+    Results are cached for ARTICLES_CACHE_TTL seconds when every country's
+    request succeeded, so an error or rate limit isn't served from cache.
+    - total_articles: number of articles to fetch (max 100 for free accounts)
+    """
+    cached = _get_cached_articles(category, total_articles)
+    if cached is not None:
+        return cached
+
+    # Fetch from both US and Canada (this might exceed 100, but we'll limit it)
+    # 50 from each country
+    articles, complete = _fetch_countries(api_key, category, page_size=50, page=1)
+    unique_articles = _dedupe_articles(articles)
+
+    if complete and unique_articles:
+        _set_cached_articles(category, total_articles, unique_articles)
+    return unique_articles
+
+async def fetch_multiple_pages_async(api_key, category=None, total_articles=100):
+    """
+    Async counterpart of fetch_multiple_pages, sharing its cache.
+    """
+    cached = _get_cached_articles(category, total_articles)
+    if cached is not None:
+        return cached
+
+    articles, complete = await _fetch_countries_async(api_key, category, page_size=50, page=1)
+    unique_articles = _dedupe_articles(articles)
+
+    if complete and unique_articles:
+        _set_cached_articles(category, total_articles, unique_articles)
+    return unique_articles
+
+async def stream_multiple_pages(api_key, category=None, total_articles=100):
+    """
+    Async counterpart of fetch_multiple_pages that yields de-duplicated batches
+    of articles as each country's response arrives. A cached result is
+    yielded as a single batch.
+    """
+    cached = _get_cached_articles(category, total_articles)
+    if cached is not None:
+        if cached:
+            yield cached
+        return
+
+    seen_articles = set()
+    unique_articles = []
+    complete = True
+
+    country_batches = _stream_countries(api_key, category, page_size=50, page=1)
+    try:
+        async for articles in country_batches:
+            if articles is None:
+                complete = False
+                continue
+
+            batch = []
+            for article in articles:
+                if _is_new_article(article, seen_articles):
+                    batch.append(article)
+                    # Limit to 100 articles total for free account
+                    if len(unique_articles) + len(batch) >= 100:
+                        break
+
+            unique_articles.extend(batch)
+            if batch:
+                yield batch
+            if len(unique_articles) >= 100:
+                break
+    finally:
+        # Close now rather than whenever the generator is garbage collected,
+        # so any outstanding country request is cancelled right away
+        await country_batches.aclose()
+
+    if complete and unique_articles:
+        _set_cached_articles(category, total_articles, unique_articles)
@@ -1,36 +1,203 @@
+import hashlib
 import logging
-from typing import List, Dict, Any
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import nltk
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
 from sumy.parsers.plaintext import PlaintextParser
 from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.text_rank import TextRankSummarizer
 from sumy.summarizers.lsa import LsaSummarizer
 from transformers import pipeline
+import torch
 import re
+from cachetools import LRUCache
+from app.models import RawArticle
+from app.model_cache import build_model_dir
 
 logger = logging.getLogger(__name__)
 
+# blingfire's compiled sentence splitter is much faster than NLTK punkt on
+# long cluster text; fall back to punkt when it isn't installed
+try:
+    import blingfire
+except ImportError:
+    blingfire = None
+
+# Cluster texts per transformer forward pass
+SUMMARY_BATCH_SIZE = 8
+# BART's position-embedding limit; longer inputs are truncated by token
+SUMMARY_MAX_INPUT_TOKENS = 1024
+# Decoding settings for BART: 4-beam search that stops once every beam
+# has finished, with repeated trigrams blocked
+SUMMARY_GENERATION_KWARGS = {
+    "num_beams": 4,
+    "no_repeat_ngram_size": 3,
+    "early_stopping": True,
+}
+# Number of generated summaries remembered by input text
+SUMMARY_CACHE_SIZE = 2048
+# Clusters with fewer words than this are summarized by their lead title
+TRIVIAL_CLUSTER_WORDS = 60
+
+SUMMARY_MODEL_NAME = "facebook/bart-large-cnn"
+# Where the exported, int8-quantized ONNX copy of the summary model is kept
+ONNX_MODEL_DIR = Path(
+    os.getenv("MODEL_CACHE_DIR", Path(__file__).parent.parent / ".model_cache")
+) / "summary-model-onnx-int8"
+
+# Text cleanup patterns, compiled once
+_WHITESPACE_RE = re.compile(r'\s+')
+_URL_RE = re.compile(
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+)
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\!\?\-]')
+_RANKING_RE = re.compile(r'No\.\s*\d+\s*')
+# A leading "The:" followed by an optional "The:"/"A:"/"An:" artifact
+_PREFIX_RE = re.compile(r'^(?:The:\s*)?(?:(?:The|A|An):\s*)?')
+
+# Cleaned texts remembered per cleanup function; the same article content
+# comes back on every refresh and can appear in several clusters
+CLEAN_TEXT_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=CLEAN_TEXT_CACHE_SIZE)
+def _clean_text(text: str) -> str:
+    """Clean and normalize text for summarization."""
+    # Remove extra whitespace
+    text = _WHITESPACE_RE.sub(' ', text)
+    
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    
+    # Remove email addresses
+    text = _EMAIL_RE.sub('', text)
+    
+    # Remove special characters but keep sentence structure
+    text = _SPECIAL_CHARS_RE.sub('', text)
+    
+    return text.strip()
+
+@lru_cache(maxsize=CLEAN_TEXT_CACHE_SIZE)
+def _clean_summary_text(text: str) -> str:
+    """Clean summary text to remove formatting artifacts and ranking numbers."""
+    # Remove ranking numbers like "No. 6", "No.3", etc. (with or without space)
+    text = _RANKING_RE.sub('', text)
+    
+    # Remove "The:" and other common prefixes that might be artifacts
+    text = _PREFIX_RE.sub('', text, count=1)
+    
+    # Clean up extra whitespace
+    text = _WHITESPACE_RE.sub(' ', text)
+    
+    # Ensure proper sentence structure
+    text = text.strip()
+    
+    # If the text starts with a lowercase letter, capitalize it
+    if text and text[0].islower():
+        text = text[0].upper() + text[1:]
+    
+    return text
+
+def _summary_model_dtype(device: str) -> torch.dtype:
+    """Pick the cheapest dtype the hardware runs natively."""
+    if device == "cuda":
+        return torch.float16
+    # bfloat16 only pays off on CPUs with native support (AVX512-BF16 / AMX)
+    is_bf16_supported = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+    if is_bf16_supported is not None and is_bf16_supported():
+        return torch.bfloat16
+    return torch.float32
+
+# Above this many sentences, PageRank is iterated instead of solved directly
+TEXTRANK_DIRECT_SOLVE_MAX = 200
+
+def _textrank_scores(similarity: np.ndarray, damping: float = 0.85,
+                     max_iterations: int = 30, tolerance: float = 1e-6) -> np.ndarray:
+    """PageRank scores for a sentence-similarity matrix."""
+    n = len(similarity)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    # Sentences similar to nothing spread their weight evenly
+    transition = np.divide(
+        similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0
+    )
+    
+    if n <= TEXTRANK_DIRECT_SOLVE_MAX:
+        # Small graphs: solve (I - d*T^T) r = (1-d)/n in one LAPACK call
+        # rather than paying per-iteration dispatch overhead
+        return np.linalg.solve(
+            np.eye(n) - damping * transition.T, np.full(n, (1 - damping) / n)
+        )
+    
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+def _split_sentences(text: str) -> List[str]:
+    """Split text into sentences."""
+    if blingfire is not None:
+        return [sentence for sentence in blingfire.text_to_sentences(text).split("\n") if sentence]
+    return nltk.sent_tokenize(text)
+
 class SummarizationService:
     def __init__(self):
         """Initialize the summarization service."""
-        self.textrank_summarizer = TextRankSummarizer()
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.lsa_summarizer = LsaSummarizer()
         self.transformer_summarizer = None
+        # Transformer summaries keyed by a hash of their input text, so
+        # unchanged clusters aren't re-run through BART on refresh
+        self._summary_cache = LRUCache(maxsize=SUMMARY_CACHE_SIZE)
+        self._summary_cache_lock = threading.Lock()
         self._load_models()
+        # Run one tiny summary in the background so kernel selection and ONNX
+        # Runtime graph optimization happen before the first real request
+        threading.Thread(target=self._warmup, name="summary-warmup", daemon=True).start()
+    
+    def _warmup(self):
+        """Run a throwaway summary through the loaded model, ignoring failures."""
+        if self.transformer_summarizer is None:
+            return
+        try:
+            self.transformer_summarizer("Warm up text " * 20, max_length=20, min_length=5)
+            logger.info("Summarization model warmed up")
+        except Exception as e:
+            logger.warning(f"Summarization model warmup failed: {e}")
     
     def _load_models(self):
         """Load summarization models."""
         try:
             logger.info("Loading transformer summarization model...")
+            if self.device == "cpu":
+                try:
+                    logger.info("Loading ONNX Runtime summarization model...")
+                    self.transformer_summarizer = self._load_onnx_summarizer()
+                    logger.info("Loaded ONNX Runtime summarization model")
+                    return
+                except Exception as e:
+                    logger.warning(f"ONNX Runtime summarizer unavailable, using PyTorch: {e}")
+            
             # Use a smaller, faster model for summarization
             try:
-                self.transformer_summarizer = pipeline(
-                    "summarization",
-                    model="facebook/bart-large-cnn",
-                    device=-1,  # Use CPU
-                    max_length=100,
-                    min_length=30
+                dtype = _summary_model_dtype(self.device)
+                try:
+                    # Fused scaled-dot-product attention, where transformers supports it for BART
+                    self.transformer_summarizer = self._build_summarizer(
+                        dtype, attn_implementation="sdpa"
+                    )
+                except Exception as e:
+                    logger.warning(f"SDPA attention unavailable, using default attention: {e}")
+                    self.transformer_summarizer = self._build_summarizer(dtype)
+                logger.info(
+                    f"Transformer summarization model loaded successfully ({dtype}, {self.device})"
                 )
-                logger.info("Transformer summarization model loaded successfully")
             except Exception as e:
                 logger.warning(f"Failed to load transformer model: {e}")
                 self.transformer_summarizer = None
@@ -40,6 +207,65 @@ class SummarizationService:
             logger.info("Falling back to extractive summarization only")
             self.transformer_summarizer = None
     
+    def _build_summarizer(self, dtype: torch.dtype, **model_kwargs):
+        """Create the summarization pipeline on this service's device."""
+        return pipeline(
+            "summarization",
+            model=SUMMARY_MODEL_NAME,
+            device=0 if self.device == "cuda" else -1,
+            torch_dtype=dtype,
+            model_kwargs=model_kwargs,
+            max_length=100,
+            min_length=30
+        )
+    
+    def _load_onnx_summarizer(self):
+        """Build a pipeline on an int8 ONNX Runtime export of BART.
+        
+        The encoder and decoders are exported and dynamically quantized on
+        first use, then reused from ONNX_MODEL_DIR on later starts. This runs
+        at import in every worker, so the export is built in a temporary
+        directory and only moved into place once complete.
+        """
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        def export(save_dir: Path):
+            logger.info("Exporting summarization model to ONNX and quantizing to int8...")
+            export_dir = save_dir / "fp32"
+            onnx_model = ORTModelForSeq2SeqLM.from_pretrained(SUMMARY_MODEL_NAME, export=True)
+            onnx_model.save_pretrained(export_dir)
+            
+            quantization_config = AutoQuantizationConfig.avx512_vnni(
+                is_static=False, per_channel=False
+            )
+            for onnx_file in export_dir.glob("*.onnx"):
+                quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=onnx_file.name)
+                quantizer.quantize(save_dir=save_dir, quantization_config=quantization_config)
+            onnx_model.config.save_pretrained(save_dir)
+            onnx_model.generation_config.save_pretrained(save_dir)
+        
+        build_model_dir(ONNX_MODEL_DIR, export)
+        has_past = (ONNX_MODEL_DIR / "decoder_with_past_model_quantized.onnx").exists()
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            ONNX_MODEL_DIR,
+            encoder_file_name="encoder_model_quantized.onnx",
+            decoder_file_name="decoder_model_quantized.onnx",
+            decoder_with_past_file_name=(
+                "decoder_with_past_model_quantized.onnx" if has_past else None
+            ),
+            use_cache=has_past
+        )
+        tokenizer = AutoTokenizer.from_pretrained(SUMMARY_MODEL_NAME)
+        return pipeline(
+            "summarization",
+            model=model,
+            tokenizer=tokenizer,
+            max_length=100,
+            min_length=30
+        )
+    
     def create_tldr_summary(self, cluster: Dict[str, Any], 
                            method: str = "hybrid") -> str:
         """
@@ -69,10 +295,43 @@ class SummarizationService:
         else:  # hybrid or fallback
             return self._hybrid_summary(combined_text, cluster)
     
-    def _summarize_single_article(self, article: Dict[str, Any]) -> str:
+    def create_tldr_summaries(self, clusters: List[Dict[str, Any]],
+                              method: str = "hybrid") -> List[str]:
+        """
+        Create TL;DR summaries for several clusters at once.
+        
+        Multi-article clusters that need the transformer are summarized in a
+        single batched pipeline call instead of one call per cluster.
+        
+        Args:
+            clusters: List of cluster dictionaries
+            method: Summarization method ("extractive", "abstractive", "hybrid")
+            
+        Returns:
+            List of TL;DR summary strings, in the same order as clusters
+        """
+        if method == "extractive" or not self.transformer_summarizer:
+            return [self.create_tldr_summary(cluster, method) for cluster in clusters]
+        
+        summaries = [None] * len(clusters)
+        batch_indices = []
+        batch_texts = []
+        for i, cluster in enumerate(clusters):
+            articles = cluster.get("articles", [])
+            if len(articles) < 2:
+                summaries[i] = self.create_tldr_summary(cluster, method)
+            else:
+                batch_indices.append(i)
+                batch_texts.append(self._combine_cluster_text(articles))
+        
+        for i, summary in zip(batch_indices, self._abstractive_summaries(batch_texts)):
+            summaries[i] = summary
+        return summaries
+    
+    def _summarize_single_article(self, article: RawArticle) -> str:
         """Create summary for a single article."""
-        title = article.get("title", "")
-        content = article.get("content", "")
+        title = article.title
+        content = article.content
         
         if not content:
             return title
@@ -88,7 +347,8 @@ class SummarizationService:
                     content,
                     max_length=50,
                     min_length=10,
-                    do_sample=False
+                    do_sample=False,
+                    **SUMMARY_GENERATION_KWARGS
                 )
                 return self._clean_summary_text(summary[0]["summary_text"])
             else:
@@ -97,24 +357,67 @@ class SummarizationService:
             logger.error(f"Error summarizing single article: {e}")
             return title
     
-    def _combine_cluster_text(self, articles: List[Dict[str, Any]]) -> str:
+    def _trivial_cluster_summary(self, cluster: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the lead article's title for clusters too small to be worth
+        running the summarizer on.
+        
+        Args:
+            cluster: Cluster dictionary
+            
+        Returns:
+            The lead title, or None if the cluster needs a real summary
+        """
+        articles = cluster.get("articles", [])
+        if not articles or not articles[0].title:
+            return None
+        
+        if len(articles) > 1:
+            total_words = sum(
+                len((article.title or "").split()) + len((article.content or "").split())
+                for article in articles
+            )
+            if total_words >= TRIVIAL_CLUSTER_WORDS:
+                return None
+        
+        return self._clean_summary_text(articles[0].title)
+    
+    def _combine_cluster_text(self, articles: List[RawArticle]) -> str:
         """Combine text from all articles in a cluster."""
         combined_parts = []
+        # Wire stories (AP, Reuters) are often carried verbatim by several
+        # outlets; only the first copy of each is passed to the summarizer
+        seen_content = set()
+        duplicates = 0
         
         for article in articles:
-            title = article.get("title", "")
-            content = article.get("content", "")
+            title = article.title
+            content = article.content
             
             if title:
                 combined_parts.append(title)
             
-            if content and len(content.split()) > 10:  # Only add substantial content
+            if content:
+                content_hash = hashlib.blake2b(
+                    content[:200].lower().strip().encode("utf-8"), digest_size=8
+                ).digest()
+                if content_hash in seen_content:
+                    duplicates += 1
+                    continue
+                seen_content.add(content_hash)
+            
+            words = content.split() if content else []
+            if len(words) > 10:  # Only add substantial content
                 # Truncate very long content
-                words = content.split()
                 if len(words) > 100:
                     content = " ".join(words[:100]) + "..."
                 combined_parts.append(content)
         
+        if duplicates:
+            logger.debug(
+                f"Skipped {duplicates}/{len(articles)} duplicate article bodies in cluster"
+            )
+        
         return " ".join(combined_parts)
     
     def _extractive_summary(self, text: str, max_sentences: int = 2) -> str:
@@ -126,20 +429,17 @@ class SummarizationService:
             if len(text.split()) < 50:
                 return text
             
-            # Parse text
-            parser = PlaintextParser.from_string(text, Tokenizer("english"))
-            
             # Try TextRank first
             try:
-                summary_sentences = self.textrank_summarizer(parser.document, max_sentences)
-                if summary_sentences:
-                    summary = " ".join([str(sentence) for sentence in summary_sentences])
+                summary = self._textrank_summary(text, max_sentences)
+                if summary:
                     return self._clean_summary_text(summary)
             except Exception as e:
                 logger.warning(f"TextRank failed: {e}")
             
             # Fallback to LSA
             try:
+                parser = PlaintextParser.from_string(text, Tokenizer("english"))
                 summary_sentences = self.lsa_summarizer(parser.document, max_sentences)
                 if summary_sentences:
                     summary = " ".join([str(sentence) for sentence in summary_sentences])
@@ -159,33 +459,97 @@ class SummarizationService:
             fallback = " ".join(words[:30]) + "..." if len(words) > 30 else text
             return self._clean_summary_text(fallback)
     
+    def _textrank_summary(self, text: str, max_sentences: int) -> str:
+        """
+        TextRank over TF-IDF sentence vectors, computed with sparse matrix ops.
+        
+        Returns the top-scoring sentences in their original order.
+        """
+        sentences = _split_sentences(text)
+        if len(sentences) <= max_sentences:
+            return " ".join(sentences)
+        
+        # TF-IDF rows are L2-normalized, so their products are cosine similarities
+        tfidf = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+        similarity = (tfidf @ tfidf.T).toarray()
+        np.fill_diagonal(similarity, 0.0)
+        
+        scores = _textrank_scores(similarity)
+        top_indices = np.sort(np.argsort(-scores, kind="stable")[:max_sentences])
+        return " ".join(sentences[i] for i in top_indices)
+    
     def _abstractive_summary(self, text: str) -> str:
         """Create abstractive summary using transformer model."""
+        return self._abstractive_summaries([text])[0]
+    
+    def _abstractive_summaries(self, texts: List[str]) -> List[str]:
+        """Create abstractive summaries for several texts in one batched model call."""
+        if not texts:
+            return []
+        
+        if not self.transformer_summarizer:
+            return [self._extractive_summary(text) for text in texts]
+        
+        # Clean texts; truncation happens on tokens in _generate_summaries
+        prepared = [self._clean_text(text) for text in texts]
+        
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in prepared]
+        with self._summary_cache_lock:
+            results = [self._summary_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
         try:
-            if not self.transformer_summarizer:
-                return self._extractive_summary(text)
-            
-            # Clean text
-            text = self._clean_text(text)
-            
-            # Truncate if too long
-            words = text.split()
-            if len(words) > 500:
-                text = " ".join(words[:500])
+            # Generate summaries for texts not seen before
+            summaries = self._generate_summaries([prepared[i] for i in missing])
             
-            # Generate summary
-            summary = self.transformer_summarizer(
-                text,
-                max_length=80,
-                min_length=20,
-                do_sample=False
-            )
-            
-            return self._clean_summary_text(summary[0]["summary_text"])
+            with self._summary_cache_lock:
+                for i, summary in zip(missing, summaries):
+                    results[i] = self._clean_summary_text(summary)
+                    self._summary_cache[keys[i]] = results[i]
+            return results
             
         except Exception as e:
             logger.error(f"Error in abstractive summarization: {e}")
-            return self._extractive_summary(text)
+            for i in missing:
+                results[i] = self._extractive_summary(prepared[i])
+            return results
+    
+    def _generate_summaries(self, texts: List[str]) -> List[str]:
+        """
+        Generate summaries with the loaded model, bypassing the pipeline.
+        
+        Inputs are tokenized once per batch with the fast tokenizer and
+        truncated to SUMMARY_MAX_INPUT_TOKENS tokens, so nothing is split on
+        whitespace first and nothing exceeds the model's limit.
+        """
+        tokenizer = self.transformer_summarizer.tokenizer
+        model = self.transformer_summarizer.model
+        # Reuse past key/values while decoding; an ONNX export without a
+        # decoder-with-past graph can't, and reports use_cache=False
+        use_cache = getattr(model, "use_cache", True)
+        
+        summaries = []
+        for start in range(0, len(texts), SUMMARY_BATCH_SIZE):
+            encoded = tokenizer(
+                texts[start:start + SUMMARY_BATCH_SIZE],
+                truncation=True,
+                max_length=SUMMARY_MAX_INPUT_TOKENS,
+                padding=True,
+                return_tensors="pt"
+            ).to(model.device)
+            with torch.inference_mode():
+                generated = model.generate(
+                    **encoded,
+                    max_length=80,
+                    min_length=20,
+                    do_sample=False,
+                    use_cache=use_cache,
+                    **SUMMARY_GENERATION_KWARGS
+                )
+            summaries.extend(tokenizer.batch_decode(generated, skip_special_tokens=True))
+        return summaries
     
     def _hybrid_summary(self, text: str, cluster: Dict[str, Any]) -> str:
         """Create hybrid summary combining multiple methods."""
@@ -215,44 +579,9 @@ class SummarizationService:
             logger.error(f"Error in hybrid summarization: {e}")
             return self._extractive_summary(text)
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize text for summarization."""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        # Remove email addresses
-        text = re.sub(r'\S+@\S+', '', text)
-        
-        # Remove special characters but keep sentence structure
-        text = re.sub(r'[^\w\s\.\,\!\?\-]', '', text)
-        
-        return text.strip()
-    
-    def _clean_summary_text(self, text: str) -> str:
-        """Clean summary text to remove formatting artifacts and ranking numbers."""
-        # Remove ranking numbers like "No. 6", "No.3", etc. (with or without space)
-        text = re.sub(r'No\.\s*\d+\s*', '', text)
-        
-        # Remove standalone "The:" at the beginning
-        text = re.sub(r'^The:\s*', '', text)
-        
-        # Remove other common prefixes that might be artifacts
-        text = re.sub(r'^(The|A|An):\s*', '', text)
-        
-        # Clean up extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Ensure proper sentence structure
-        text = text.strip()
-        
-        # If the text starts with a lowercase letter, capitalize it
-        if text and text[0].islower():
-            text = text[0].upper() + text[1:]
-        
-        return text
+    # Text cleanup lives at module level so lru_cache can memoize it
+    _clean_text = staticmethod(_clean_text)
+    _clean_summary_text = staticmethod(_clean_summary_text)
 
     def create_category_tldr(self, clusters: List[Dict[str, Any]], 
                            category: str, max_summaries: int = 5) -> Dict[str, Any]:
@@ -271,20 +600,38 @@ class SummarizationService:
             # Sort clusters by size (most articles first)
             sorted_clusters = sorted(clusters, key=lambda x: x.get("size", 0), reverse=True)
             
-            # Create summaries for top clusters
-            summaries = []
-            for i, cluster in enumerate(sorted_clusters[:max_summaries]):
+            # Create summaries for top clusters, batching the transformer calls.
+            # Trivial clusters are summarized by their lead title, so only the
+            # rest go to the model.
+            top_clusters = sorted_clusters[:max_summaries]
+            summary_texts = [self._trivial_cluster_summary(cluster) for cluster in top_clusters]
+            heavy_indices = [i for i, text in enumerate(summary_texts) if text is None]
+            if heavy_indices:
                 try:
-                    summary_text = self.create_tldr_summary(cluster, method="hybrid")
-                    summaries.append({
-                        "rank": i + 1,
-                        "summary": summary_text,
-                        "article_count": cluster.get("size", 0),
-                        "key_entities": cluster.get("key_entities", [])[:3]
-                    })
+                    heavy_summaries = self.create_tldr_summaries(
+                        [top_clusters[i] for i in heavy_indices], method="hybrid"
+                    )
                 except Exception as e:
-                    logger.error(f"Error creating summary for cluster {i}: {e}")
-                    continue
+                    logger.error(f"Error creating batched summaries: {e}")
+                    heavy_summaries = [None] * len(heavy_indices)
+                for i, summary_text in zip(heavy_indices, heavy_summaries):
+                    summary_texts[i] = summary_text
+            
+            summaries = []
+            for i, (cluster, summary_text) in enumerate(zip(top_clusters, summary_texts)):
+                if summary_text is None:
+                    # Retry this cluster on its own
+                    try:
+                        summary_text = self.create_tldr_summary(cluster, method="hybrid")
+                    except Exception as e:
+                        logger.error(f"Error creating summary for cluster {i}: {e}")
+                        continue
+                summaries.append({
+                    "rank": i + 1,
+                    "summary": summary_text,
+                    "article_count": cluster.get("size", 0),
+                    "key_entities": cluster.get("key_entities", [])[:3]
+                })
             
             return {
                 "category": category,
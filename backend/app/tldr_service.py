@@ -1,10 +1,15 @@
 import logging
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
+from cachetools import TTLCache
 from app.article_clustering import article_clusterer
 from app.summarization_service import summarization_service
 from app.news_fetcher import fetch_multiple_pages
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,12 +17,49 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# diskcache keeps generated TL;DRs across restarts and shares them between
+# worker processes; without it the cache is per-process and in memory
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# Categories refreshed at once by get_all_categories_tldr
+CATEGORY_WORKERS = 7
+# How long a generated TL;DR is served from cache
+TLDR_CACHE_TTL = 3600  # seconds
+TLDR_CACHE_DIR = Path(
+    os.getenv("TLDR_CACHE_DIR", Path(__file__).parent.parent / ".tldr_cache")
+)
+TLDR_CACHE_SIZE_LIMIT = 512 << 20  # bytes
+
+@dataclass
+class _CategoryGeneration:
+    """Callers generating, or waiting on, one category's TL;DR."""
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Callers holding or waiting on lock; the entry is dropped when it hits 0
+    users: int = 0
+    # Number of generations finished, and the latest one's result
+    completed: int = 0
+    result: Optional[Dict[str, Any]] = None
+
 class TLDRService:
     def __init__(self):
         """Initialize the TL;DR service."""
         self.news_api_key = os.getenv("NEWSAPI_KEY")
-        self.cache = {}  # Simple in-memory cache
-        self.cache_duration = timedelta(hours=1)  # Cache for 1 hour
+        self._persistent = diskcache is not None
+        if self._persistent:
+            self.cache = diskcache.Cache(str(TLDR_CACHE_DIR), size_limit=TLDR_CACHE_SIZE_LIMIT)
+        else:
+            # Bounded cache; expired entries are evicted automatically
+            self.cache = TTLCache(maxsize=64, ttl=TLDR_CACHE_TTL)
+        # Categories are generated from worker threads
+        self._cache_lock = threading.Lock()
+        # Per-category generations, so concurrent misses (or forced refreshes)
+        # generate a category only once
+        self._inflight: Dict[str, _CategoryGeneration] = {}
+        self._inflight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=CATEGORY_WORKERS, thread_name_prefix="tldr")
     
     def get_category_tldr(self, category: str = "all", 
                          force_refresh: bool = False) -> Dict[str, Any]:
@@ -32,15 +74,61 @@ class TLDRService:
             Dictionary with TL;DR information for the category
         """
         cache_key = f"tldr_{category}"
-        current_time = datetime.now()
         
         # Check cache first
-        if not force_refresh and cache_key in self.cache:
-            cached_data, cache_time = self.cache[cache_key]
-            if current_time - cache_time < self.cache_duration:
+        if not force_refresh:
+            cached_data = self._get_cached(cache_key)
+            if cached_data is not None:
                 logger.info(f"Returning cached TL;DR for category: {category}")
                 return cached_data
         
+        with self._inflight_lock:
+            generation = self._inflight.get(cache_key)
+            if generation is None:
+                generation = self._inflight[cache_key] = _CategoryGeneration()
+            generation.users += 1
+            completed_before = generation.completed
+        
+        try:
+            with generation.lock:
+                # Another request generated it while we waited; that result
+                # is as fresh as a forced refresh needs
+                if generation.completed > completed_before:
+                    logger.info(f"Returning just-generated TL;DR for category: {category}")
+                    return generation.result
+                if not force_refresh:
+                    cached_data = self._get_cached(cache_key)
+                    if cached_data is not None:
+                        logger.info(f"Returning cached TL;DR for category: {category}")
+                        return cached_data
+                
+                result = self._generate_category_tldr(category, cache_key, datetime.now())
+                generation.result = result
+                generation.completed += 1
+                return result
+        finally:
+            with self._inflight_lock:
+                generation.users -= 1
+                if generation.users == 0 and self._inflight.get(cache_key) is generation:
+                    del self._inflight[cache_key]
+    
+    def _get_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached TL;DR, or None if missing or expired."""
+        with self._cache_lock:
+            return self.cache.get(cache_key)
+    
+    def _set_cached(self, cache_key: str, value: Dict[str, Any]):
+        """Cache a TL;DR for TLDR_CACHE_TTL seconds."""
+        with self._cache_lock:
+            if self._persistent:
+                self.cache.set(cache_key, value, expire=TLDR_CACHE_TTL)
+            else:
+                self.cache[cache_key] = value
+    
+    def _generate_category_tldr(self, category: str, cache_key: str,
+                                current_time: datetime) -> Dict[str, Any]:
+        """Fetch, cluster and summarize a category, caching the result."""
+        today = current_time.strftime("%Y-%m-%d")
         try:
             logger.info(f"Generating TL;DR for category: {category}")
             
@@ -54,7 +142,7 @@ class TLDRService:
             if not articles:
                 return {
                     "category": category,
-                    "date": current_time.strftime("%Y-%m-%d"),
+                    "date": today,
                     "total_clusters": 0,
                     "total_articles": 0,
                     "summaries": [],
@@ -77,10 +165,10 @@ class TLDRService:
             
             # Add timestamp
             tldr_result["generated_at"] = current_time.isoformat()
-            tldr_result["date"] = current_time.strftime("%Y-%m-%d")
+            tldr_result["date"] = today
             
             # Cache the result
-            self.cache[cache_key] = (tldr_result, current_time)
+            self._set_cached(cache_key, tldr_result)
             
             logger.info(f"Generated TL;DR for {category}: {len(clusters)} clusters, {len(articles)} articles")
             return tldr_result
@@ -89,7 +177,7 @@ class TLDRService:
             logger.error(f"Error generating TL;DR for category {category}: {e}")
             return {
                 "category": category,
-                "date": current_time.strftime("%Y-%m-%d"),
+                "date": today,
                 "total_clusters": 0,
                 "total_articles": 0,
                 "summaries": [],
@@ -111,13 +199,24 @@ class TLDRService:
         if categories is None:
             categories = ["all", "business", "technology", "health", "science", "sports", "entertainment"]
         
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        
         results = {}
         total_articles = 0
         total_clusters = 0
         
-        for category in categories:
+        # Fetch, cluster and summarize the categories in parallel; NewsAPI I/O
+        # and the model forward passes release the GIL
+        futures = {
+            self._executor.submit(self.get_category_tldr, category, force_refresh): category
+            for category in categories
+        }
+        
+        for future in as_completed(futures):
+            category = futures[future]
             try:
-                category_result = self.get_category_tldr(category, force_refresh)
+                category_result = future.result()
                 results[category] = category_result
                 
                 total_articles += category_result.get("total_articles", 0)
@@ -127,7 +226,7 @@ class TLDRService:
                 logger.error(f"Error processing category {category}: {e}")
                 results[category] = {
                     "category": category,
-                    "date": datetime.now().strftime("%Y-%m-%d"),
+                    "date": today,
                     "total_clusters": 0,
                     "total_articles": 0,
                     "summaries": [],
@@ -135,12 +234,13 @@ class TLDRService:
                 }
         
         return {
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "generated_at": datetime.now().isoformat(),
+            "date": today,
+            "generated_at": now.isoformat(),
             "total_categories": len(categories),
             "total_articles": total_articles,
             "total_clusters": total_clusters,
-            "categories": results
+            # Keep the requested category order regardless of completion order
+            "categories": {category: results[category] for category in categories}
         }
     
     def get_trending_topics(self, category: str = "all", 
@@ -181,26 +281,25 @@ class TLDRService:
     
     def clear_cache(self):
         """Clear the TL;DR cache."""
-        self.cache.clear()
+        with self._cache_lock:
+            self.cache.clear()
         logger.info("TL;DR cache cleared")
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        current_time = datetime.now()
-        active_entries = 0
-        expired_entries = 0
-        
-        for cache_key, (_, cache_time) in self.cache.items():
-            if current_time - cache_time < self.cache_duration:
-                active_entries += 1
-            else:
-                expired_entries += 1
+        with self._cache_lock:
+            # Drop expired entries so the counts reflect servable data
+            self.cache.expire()
+            active_entries = len(self.cache)
+            size_bytes = self.cache.volume() if self._persistent else None
         
         return {
-            "total_entries": len(self.cache),
+            "total_entries": active_entries,
             "active_entries": active_entries,
-            "expired_entries": expired_entries,
-            "cache_duration_hours": self.cache_duration.total_seconds() / 3600
+            "expired_entries": 0,
+            "cache_duration_hours": TLDR_CACHE_TTL / 3600,
+            "persistent": self._persistent,
+            "size_bytes": size_bytes
         }
 
 # Global instance